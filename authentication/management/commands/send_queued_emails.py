@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.mail import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox through EMAIL_OUTBOX_BACKEND."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox has nothing due.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no more emails are due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        claimed = 0
+        while True:
+            batch = send_outbox_batch(batch_size=options["batch_size"])
+            claimed += batch
+            if batch:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {claimed} queued emails"))
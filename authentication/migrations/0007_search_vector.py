@@ -0,0 +1,60 @@
+# Generated by Django 3.2.9 on 2026-10-18 15:35
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE FUNCTION authentication_user_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF NEW.role = 'service_provider' THEN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.business_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.service_category, '')), 'A') ||
+            setweight(to_tsvector('english', array_to_string(NEW.keywords, ' ')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.location, '')), 'C');
+    ELSE
+        NEW.search_vector := NULL;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER authentication_user_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF
+        role, business_name, service_category, keywords, location, search_vector
+    ON authentication_user
+    FOR EACH ROW EXECUTE PROCEDURE authentication_user_search_vector_update();
+
+-- backfill existing providers through the trigger
+UPDATE authentication_user SET search_vector = NULL WHERE role = 'service_provider';
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER authentication_user_search_vector_trigger ON authentication_user;
+DROP FUNCTION authentication_user_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0006_auto_20261018_1525'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='user_search_vector_idx'),
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from phonenumber_field.modelfields import PhoneNumberField
 from .manager import UserManager
 import uuid
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 
 # Create your models here.
@@ -14,6 +17,12 @@ ROLES = (
     ("service_provider", "service_provider"),
 )
 
+OUTBOX_STATUSES = (
+    ("pending", "pending"),
+    ("sent", "sent"),
+    ("failed", "failed"),
+)
+
 
 class User(AbstractUser):
     id = models.UUIDField(
@@ -41,12 +50,21 @@ class User(AbstractUser):
         max_length=225, blank=True, null=True, verbose_name="Proof of business"
     )
     is_verified_business = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # maintained by a database trigger for service providers, see migration 0007
+    search_vector = SearchVectorField(null=True, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["role"], name="user_role_idx"),
+            GinIndex(fields=["search_vector"], name="user_search_vector_idx"),
+        ]
+
     def __str__(self):
         return f"{self.email}"
 
@@ -60,3 +78,31 @@ class User(AbstractUser):
         if (self.phone_verification or self.email_verification) and self.is_verified:
             return True
         return False
+
+
+class EmailOutbox(models.Model):
+    id = models.UUIDField(
+        primary_key=True, default=uuid.uuid4, editable=False, unique=True
+    )
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=225)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=OUTBOX_STATUSES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name_plural = "Email outbox"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outbox_pending_idx",
+                condition=models.Q(status="pending"),
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
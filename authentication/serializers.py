@@ -1,9 +1,13 @@
+from django.db.models import Manager, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 from rest_framework.validators import UniqueValidator
 from .models import User
 from phonenumber_field.modelfields import PhoneNumberField
+from src.fieldsets import SparseFieldsetMixin
 from src.utils import Utils
+from services.models import RatingSummary
+from services.serializers import RatingSummarySerializer
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -20,7 +24,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class CustomerRegistrationSerializer(serializers.ModelSerializer):
+class CustomerRegistrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     phone_number = PhoneNumberField(unique=True)
     email = serializers.EmailField(
         required=True, validators=[UniqueValidator(queryset=User.objects.all())]
@@ -92,6 +96,8 @@ class ServiceProviderRegistrationSerializer(serializers.ModelSerializer):
     )
     confirm_password = serializers.CharField(write_only=True, required=True)
 
+    sp_id = serializers.CharField(source="pk", read_only=True)
+
     class Meta:
         model = User
         fields = (
@@ -137,12 +143,11 @@ class ServiceProviderRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     phone_number = PhoneNumberField(unique=True)
     email = serializers.EmailField(
         required=True, validators=[UniqueValidator(queryset=User.objects.all())]
     )
-    sp_id = serializers.CharField(source="pk", read_only=True)
 
     class Meta:
         model = User
@@ -170,12 +175,27 @@ class CustomerSerializer(serializers.ModelSerializer):
         ]
 
 
-class ServiceProviderSerializer(serializers.ModelSerializer):
+class ServiceProviderListSerializer(serializers.ListSerializer):
+    """
+    Loads the rating summaries that were not joined in with
+    select_related("rating_summary") in one query for the whole list,
+    instead of one per provider.
+    """
+
+    def to_representation(self, data):
+        providers = list(data.all() if isinstance(data, Manager) else data)
+        if "rating_summary" in self.child.fields:
+            prefetch_related_objects(providers, "rating_summary")
+        return super().to_representation(providers)
+
+
+class ServiceProviderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     phone_number = PhoneNumberField(unique=True)
     email = serializers.EmailField(
         required=True, validators=[UniqueValidator(queryset=User.objects.all())]
     )
     sp_id = serializers.CharField(source="pk", read_only=True)
+    rating_summary = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -193,7 +213,9 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
             "sp_id",
             "business_name",
             "is_verified_business",
+            "rating_summary",
         )
+        list_serializer_class = ServiceProviderListSerializer
         extra_kwargs = {
             "first_name": {"required": True},
             "last_name": {"required": True},
@@ -206,6 +228,13 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
             "phone_verification",
         ]
 
+    def get_rating_summary(self, obj):
+        try:
+            summary = obj.rating_summary
+        except RatingSummary.DoesNotExist:
+            summary = RatingSummary(service_provider=obj)
+        return RatingSummarySerializer(summary).data
+
 
 class VerificationSerializer(serializers.Serializer):
     otp = serializers.CharField(required=True, write_only=True)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import EmailOutbox, User
+from src.asgi import application, static_files
+from src.asyncviews import database_sync_to_async
+
+
+async def asgi_get(app, path, headers=()):
+    """(status, headers, body) of a GET sent straight to an ASGI app."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+
+class DatabaseSyncToAsyncTest(SimpleTestCase):
+    @override_settings(ASGI_MODE=True, ASYNC_DB_THREADS=2)
+    async def test_calls_share_a_bounded_pool(self):
+        def work():
+            time.sleep(0.01)
+            return threading.current_thread().name
+
+        names = await asyncio.gather(
+            *(database_sync_to_async(work)() for _ in range(8))
+        )
+
+        self.assertTrue(all(name.startswith("db") for name in names))
+        self.assertLessEqual(len(set(names)), 2)
+
+
+class AsyncViewTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(
+            email="johndoe@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000001",
+            role="customer",
+        )
+
+    async def test_reset_password_email_over_asgi(self):
+        response = await self.async_client.post(
+            "/api/v1/reset-password-email",
+            {"email": "johndoe@skill4cash.com"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        outbox = await sync_to_async(list)(EmailOutbox.objects.all())
+        self.assertEqual(
+            [email.to_email for email in outbox], ["johndoe@skill4cash.com"]
+        )
+
+    async def test_unknown_email_over_asgi(self):
+        response = await self.async_client.post(
+            "/api/v1/reset-password-email",
+            {"email": "nobody@skill4cash.com"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 406)
+
+
+class ASGIApplicationTest(TransactionTestCase):
+    def setUp(self):
+        for x in range(3):
+            User.objects.create_user(
+                email=f"customer{x}@skill4cash.com",
+                password="Password1!",
+                phone_number=f"+23480300000{x:02d}",
+                role="customer",
+            )
+        admin = User.objects.get(email="customer0@skill4cash.com")
+        admin.is_staff = True
+        admin.save()
+        self.token = str(AccessToken.for_user(admin))
+
+    async def test_export_streams_from_the_database(self):
+        status, _, body = await asgi_get(
+            application,
+            "/api/v1/customers/export/",
+            headers=[("authorization", f"Bearer {self.token}")],
+        )
+
+        self.assertEqual(status, 200)
+        emails = [json.loads(line)["email"] for line in body.decode().splitlines()]
+        self.assertEqual(len(emails), 3)
+
+    async def test_hashed_static_files_are_served(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "admin" / "css" / "base.1f418065fc2c.css"
+            path.parent.mkdir(parents=True)
+            path.write_text("body {}")
+
+            status, headers, body = await asgi_get(
+                static_files(root, "/static/"),
+                "/static/admin/css/base.1f418065fc2c.css",
+            )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"body {}")
+        self.assertIn(b"immutable", headers[b"cache-control"])
@@ -0,0 +1,86 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+from services.models import Rating, RatingSummary
+
+
+class ConditionalDetailTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000001",
+            role="customer",
+            location="Lagos",
+        )
+        self.service_provider = User.objects.create_user(
+            email="sp@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000002",
+            role="service_provider",
+            business_name="Sparks Electricals",
+            location="Lagos",
+        )
+        self.client.force_authenticate(self.customer)
+
+    def test_unchanged_customer_is_not_modified(self):
+        url = f"/api/v1/customers/{self.customer.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.customer.location = "Abuja"
+        self.customer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["location"], "Abuja")
+
+    def test_same_second_edit_is_not_hidden_by_if_modified_since(self):
+        url = f"/api/v1/customers/{self.customer.id}/"
+        response = self.client.get(url)
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        self.customer.location = "Abuja"
+        self.customer.save()
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["location"], "Abuja")
+
+    def test_new_review_changes_service_provider_etag(self):
+        """
+        The provider body embeds its rating summary, so a new review
+        must invalidate it even though the user row is unchanged.
+        """
+        url = f"/api/v1/sp/{self.service_provider.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        rating = Rating.objects.create(
+            service_provider=self.service_provider,
+            customer=self.customer,
+            rating=8,
+            review="This is good :)",
+        )
+        RatingSummary.objects.record(rating)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rating_summary"]["count"], 1)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_fields_select_columns_and_summary(self):
+        url = f"/api/v1/sp/{self.service_provider.id}/"
+
+        response = self.client.get(url, {"fields": "business_name,rating_summary"})
+
+        self.assertEqual(set(response.data), {"business_name", "rating_summary"})
+        self.assertEqual(response.data["rating_summary"]["count"], 0)
+        etag = response["ETag"]
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
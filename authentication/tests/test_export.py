@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+
+
+class UserExportTest(APITestCase):
+    def setUp(self):
+        for x in range(3):
+            User.objects.create_user(
+                email=f"customer{x}@skill4cash.com",
+                password="Password1!",
+                phone_number=f"+23480300000{x:02d}",
+                role="customer",
+                location="Lagos",
+            )
+        User.objects.create_user(
+            email="sp@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000099",
+            role="service_provider",
+            business_name="Sparks Electricals",
+            keywords=["wiring", "solar"],
+            location="Lagos",
+        )
+        self.admin = User.objects.create_user(
+            email="ops@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000098",
+            role="customer",
+        )
+        self.admin.is_staff = True
+        self.admin.save()
+        self.client.force_authenticate(self.admin)
+
+    def export(self, path, **params):
+        response = self.client.get(path, params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_customers_stream_as_ndjson(self):
+        response, body = self.export("/api/v1/customers/export/")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["email"], "customer0@skill4cash.com")
+        self.assertEqual(rows[0]["phone_number"], "+2348030000000")
+
+    def test_providers_stream_as_csv(self):
+        response, body = self.export("/api/v1/sp/export/", output="csv")
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["business_name"], "Sparks Electricals")
+        self.assertEqual(rows[0]["keywords"], "wiring;solar")
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get("/api/v1/customers/export/", {"output": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_is_staff_only(self):
+        self.client.force_authenticate(
+            User.objects.get(email="customer0@skill4cash.com")
+        )
+
+        response = self.client.get("/api/v1/customers/export/")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+from src.otp import otp_store
+
+
+class OTPStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User(email="johndoe@skill4cash.com")
+        self.number = "+2348030000001"
+        otp_store.save(self.user, self.number, "12345")
+
+    def test_correct_code_verifies_once(self):
+        """
+        A correct code should verify and then be consumed.
+        """
+        self.assertTrue(otp_store.verify(self.user, self.number, "12345")["status"])
+        self.assertFalse(otp_store.verify(self.user, self.number, "12345")["status"])
+
+    def test_code_is_bound_to_user_and_number(self):
+        other = User(email="janedoe@skill4cash.com")
+
+        self.assertFalse(otp_store.verify(other, self.number, "12345")["status"])
+        self.assertFalse(
+            otp_store.verify(self.user, "+2348030000002", "12345")["status"]
+        )
+
+    def test_code_is_not_stored_in_clear(self):
+        self.assertNotIn("12345", cache.get(otp_store.key(self.user, self.number)))
+
+    @override_settings(OTP_MAX_ATTEMPTS=2)
+    def test_code_is_burnt_after_max_attempts(self):
+        otp_store.verify(self.user, self.number, "00000")
+        otp_store.verify(self.user, self.number, "00000")
+
+        result = otp_store.verify(self.user, self.number, "12345")
+
+        self.assertFalse(result["status"])
+        self.assertEqual(result["message"], "Too many attempts, request a new OTP")
+
+    def test_expired_code_is_rejected(self):
+        cache.delete(otp_store.key(self.user, self.number))
+
+        result = otp_store.verify(self.user, self.number, "12345")
+
+        self.assertEqual(result["message"], "OTP expired or not requested")
+
+
+class VerifyPhoneTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="johndoe@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000001",
+            role="customer",
+        )
+        self.client.force_authenticate(self.user)
+
+    @mock.patch("src.utils.send_otp", return_value="12345")
+    def test_phone_is_verified_without_a_session(self, send_otp):
+        """
+        Requesting then confirming an OTP should work across
+        requests without touching the session.
+        """
+        response = self.client.post("/api/v1/otp/verification/", {}, format="json")
+        self.assertEqual(response.data["message"], "OTP sent successfully")
+        send_otp.assert_called_once_with("+2348030000001")
+
+        response = self.client.post(
+            "/api/v1/otp/verification/", {"otp": "12345"}, format="json"
+        )
+
+        self.assertEqual(response.data["message"], "OTP Code Verified")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.phone_verification)
+        self.assertNotIn("code", self.client.session.keys())
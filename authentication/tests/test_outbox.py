@@ -0,0 +1,110 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import EmailOutbox
+from src.mail import claim_outbox_batch, send_outbox_batch
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("SES unavailable")
+
+
+class RegistrationOutboxTest(APITestCase):
+    def test_registration_queues_verification_email(self):
+        """
+        Registering should write an outbox row instead of
+        calling the email provider inline.
+        """
+        data = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "johndoe@skill4cash.com",
+            "phone_number": "+2348030000001",
+            "password": "Password1!",
+            "confirm_password": "Password1!",
+            "location": "Lagos",
+        }
+
+        response = self.client.post("/api/v1/customers/", data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.to_email, data["email"])
+        self.assertEqual(queued.status, "pending")
+        self.assertIn(response.data["verification_link"], queued.body)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(EMAIL_OUTBOX_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class SendQueuedEmailsTest(TestCase):
+    def queue(self, count=1):
+        for x in range(count):
+            EmailOutbox.objects.create(
+                to_email=f"user{x}@skill4cash.com",
+                subject="Verify your email",
+                body="<p>link</p>",
+            )
+
+    def test_worker_drains_outbox_in_batches(self):
+        self.queue(5)
+
+        call_command(
+            "send_queued_emails", "--once", "--batch-size=2", stdout=StringIO()
+        )
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(EmailOutbox.objects.exclude(status="sent").exists())
+
+    def test_emails_not_yet_due_are_skipped(self):
+        self.queue()
+        EmailOutbox.objects.update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertEqual(send_outbox_batch(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_emails_are_leased(self):
+        """
+        Claimed rows are left to their worker until the lease runs out,
+        then picked up again should that worker have died.
+        """
+        self.queue()
+        claim_outbox_batch(batch_size=1)
+
+        self.assertEqual(send_outbox_batch(), 0)
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_outbox_batch(), 1)
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.attempts), ("sent", 2))
+
+    @override_settings(
+        EMAIL_OUTBOX_BACKEND="authentication.tests.test_outbox.FailingEmailBackend",
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    )
+    def test_failures_back_off_then_give_up(self):
+        """
+        A failed send is retried later with a growing delay and
+        marked failed after EMAIL_OUTBOX_MAX_ATTEMPTS.
+        """
+        self.queue()
+
+        send_outbox_batch()
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.attempts), ("pending", 1))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(email.last_error, "SES unavailable")
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        send_outbox_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("failed", 2))
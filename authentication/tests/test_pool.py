@@ -0,0 +1,81 @@
+import time
+
+from django.db import connection
+from django.test import TestCase
+from psycopg2.pool import PoolError
+
+from src.pooled_postgresql.base import ConnectionPool
+
+
+class ConnectionPoolTest(TestCase):
+    def pool(self, minconn=1, maxconn=2, max_lifetime=60, timeout=0.1, idle_check=0):
+        pool = ConnectionPool(
+            minconn,
+            maxconn,
+            max_lifetime,
+            timeout,
+            idle_check,
+            **connection.get_connection_params(),
+        )
+        self.addCleanup(pool.closeall)
+        return pool
+
+    def test_connections_are_reused(self):
+        pool = self.pool()
+        conn = pool.checkout()
+        pid = conn.get_backend_pid()
+        pool.checkin(conn)
+
+        self.assertEqual(pool.checkout().get_backend_pid(), pid)
+
+    def test_idle_connections_beyond_minconn_are_kept(self):
+        pool = self.pool(minconn=1, maxconn=2)
+        first, second = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+
+        self.assertFalse(first.closed)
+        self.assertFalse(second.closed)
+
+    def test_recently_used_connections_are_not_pinged(self):
+        pool = self.pool(idle_check=60)
+        conn = pool.checkout()
+        pool.checkin(conn)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [conn.get_backend_pid()])
+
+        self.assertIs(pool.checkout(), conn)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        pool = self.pool(maxconn=1)
+        pool.checkout()
+
+        with self.assertRaises(PoolError):
+            pool.checkout()
+
+    def test_dead_connections_are_replaced_on_checkout(self):
+        pool = self.pool()
+        conn = pool.checkout()
+        pid = conn.get_backend_pid()
+        pool.checkin(conn)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        conn = pool.checkout()
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.assertNotEqual(conn.get_backend_pid(), pid)
+
+    def test_connections_are_retired_after_max_lifetime(self):
+        pool = self.pool(max_lifetime=0.01)
+        conn = pool.checkout()
+        time.sleep(0.02)
+        pool.checkin(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertNotEqual(pool.checkout(), conn)
+
+    def test_django_connections_come_from_the_pool(self):
+        self.assertEqual(connection.vendor, "postgresql")
+        self.assertIsNotNone(connection.pool)
@@ -0,0 +1,76 @@
+import datetime
+import gzip
+import io
+import uuid
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from phonenumber_field.phonenumber import to_python
+from rest_framework.exceptions import ParseError
+
+from src.compression import CompressionMiddleware
+from src.parsers import ORJSONParser
+from src.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_renders_uuids_datetimes_and_phone_numbers(self):
+        data = {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "at": datetime.datetime(2022, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+            "phone_number": to_python("+2348030000001"),
+            1: "non-string key",
+        }
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            b'{"id":"12345678-1234-5678-1234-567812345678",'
+            b'"at":"2022-01-02T03:04:05Z","phone_number":"+2348030000001",'
+            b'"1":"non-string key"}',
+        )
+
+    def test_escapes_javascript_line_separators(self):
+        self.assertEqual(ORJSONRenderer().render(["\u2028\u2029"]), b'["\\u2028\\u2029"]')
+
+    def test_indent(self):
+        rendered = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def test_parses(self):
+        stream = io.BytesIO('{"name": "Adé"}'.encode())
+        self.assertEqual(ORJSONParser().parse(stream), {"name": "Adé"})
+
+    def test_other_encodings(self):
+        stream = io.BytesIO('{"name": "Adé"}'.encode("latin-1"))
+        parsed = ORJSONParser().parse(stream, parser_context={"encoding": "latin-1"})
+        self.assertEqual(parsed, {"name": "Adé"})
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
+
+
+@override_settings(GZIP_MIN_LENGTH=1024)
+class CompressionMiddlewareTest(SimpleTestCase):
+    def respond(self, content, **headers):
+        request = RequestFactory().get("/", **headers)
+        middleware = CompressionMiddleware(lambda request: HttpResponse(content))
+        return middleware(request)
+
+    def test_compresses_large_responses(self):
+        content = b"x" * 2048
+        response = self.respond(content, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), content)
+
+    def test_leaves_small_responses(self):
+        response = self.respond(b"x" * 1000, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_needs_accept_encoding(self):
+        response = self.respond(b"x" * 2048)
+        self.assertFalse(response.has_header("Content-Encoding"))
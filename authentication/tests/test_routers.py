@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import User
+from src.routers import ReplicaMiddleware
+
+
+@override_settings(REPLICA_DATABASES=["replica_1"], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.reads = []
+        self.write = False
+        self.middleware = ReplicaMiddleware(self.view)
+
+    def view(self, request):
+        self.reads.append(router.db_for_read(User))
+        if self.write:
+            router.db_for_write(User)
+            self.reads.append(router.db_for_read(User))
+        return HttpResponse()
+
+    def request(self, method, ip="10.0.0.1", token=None):
+        extra = {"REMOTE_ADDR": ip}
+        if token:
+            extra["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        self.middleware(getattr(self.factory, method)("/api/v1/reviews/", **extra))
+        return self.reads[-1]
+
+    def test_safe_requests_read_from_the_replica(self):
+        self.assertEqual(self.request("get"), "replica_1")
+        self.assertEqual(self.request("post"), "default")
+
+    def test_writer_is_pinned_to_the_primary(self):
+        self.request("post")
+
+        self.assertEqual(self.request("get"), "default")
+        self.assertEqual(self.request("get", ip="10.0.0.2"), "replica_1")
+
+    def test_pin_follows_the_token_user(self):
+        token = AccessToken.for_user(User(email="pinned@skill4cash.com"))
+        self.request("post", token=token)
+
+        self.assertEqual(self.request("get", ip="10.0.0.2", token=token), "default")
+        self.assertEqual(self.request("get", ip="10.0.0.2"), "replica_1")
+
+    def test_write_during_a_safe_request(self):
+        self.write = True
+        self.request("get")
+
+        self.assertEqual(self.reads, ["replica_1", "default"])
+        self.write = False
+        self.assertEqual(self.request("get"), "default")
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        self.request("post")
+
+        self.assertEqual(self.request("get"), "replica_1")
+
+    def test_outside_requests_use_the_primary(self):
+        self.assertEqual(router.db_for_read(User), "default")
@@ -0,0 +1,73 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+
+
+class ServiceProviderSearchTest(APITestCase):
+    def setUp(self):
+        providers = [
+            ("Sparks Electricals", "Electrician", ["wiring", "solar"], "Lagos"),
+            ("Bright Wires", "Electrician", ["inverter"], "Ibadan"),
+            ("Stitch Lab", "FashionDesigner", ["electrician"], "Lagos"),
+            ("Code House", "WebDeveloper", ["django"], "Kano"),
+        ]
+        for x, (business_name, category, keywords, location) in enumerate(providers):
+            User.objects.create_user(
+                email=f"sp{x}@skill4cash.com",
+                password="Password1!",
+                phone_number=f"+23480300000{x:02d}",
+                role="service_provider",
+                business_name=business_name,
+                service_category=category,
+                keywords=keywords,
+                location=location,
+            )
+        User.objects.create_user(
+            email="customer@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000099",
+            role="customer",
+            location="Lagos",
+        )
+
+    def search(self, query, **params):
+        return self.client.get("/api/v1/sp/search/", {"q": query, **params})
+
+    def test_search_ranks_weighted_fields(self):
+        """
+        A match on service_category should outrank a keyword match.
+        """
+        response = self.search("electrician")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [sp["business_name"] for sp in response.data["results"]]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[-1], "Stitch Lab")
+
+    def test_search_combines_terms_and_location(self):
+        response = self.search("electrician lagos")
+
+        names = [sp["business_name"] for sp in response.data["results"]]
+        self.assertEqual(names[0], "Sparks Electricals")
+        self.assertNotIn("Bright Wires", names)
+
+    def test_search_vector_follows_updates(self):
+        provider = User.objects.get(business_name="Code House")
+        provider.keywords = ["react"]
+        provider.save()
+
+        self.assertEqual(self.search("django").data["results"], [])
+        self.assertEqual(len(self.search("react").data["results"]), 1)
+
+    def test_search_results_are_paginated(self):
+        first = self.search("electrician", page_size=2)
+        second = self.client.get(first.data["next"])
+
+        names = [sp["business_name"] for sp in first.data["results"]]
+        names += [sp["business_name"] for sp in second.data["results"]]
+        self.assertEqual(len(set(names)), 3)
+        self.assertIsNone(second.data["next"])
+
+    def test_blank_query_is_rejected(self):
+        self.assertEqual(self.search("  ").status_code, status.HTTP_400_BAD_REQUEST)
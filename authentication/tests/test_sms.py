@@ -0,0 +1,99 @@
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+from src import sms
+from src.sms import LocmemSMSBackend, SMSDispatcher
+
+held = threading.Event()
+failures = []
+
+
+class HeldSMSBackend(LocmemSMSBackend):
+    def send(self, to, body):
+        held.wait(5)
+        super().send(to, body)
+
+
+class FlakySMSBackend(LocmemSMSBackend):
+    def send(self, to, body):
+        if failures:
+            raise failures.pop()
+        super().send(to, body)
+
+
+@override_settings(
+    SMS_BACKEND="authentication.tests.test_sms.FlakySMSBackend",
+    SMS_RETRY_DELAY=0.01,
+    SMS_MAX_ATTEMPTS=3,
+)
+class SMSDispatcherTest(SimpleTestCase):
+    def setUp(self):
+        sms.outbox.clear()
+        failures.clear()
+        self.dispatcher = SMSDispatcher()
+
+    def test_latest_message_per_number_wins(self):
+        # nothing can be taken while the lock is held
+        with self.dispatcher._condition:
+            self.dispatcher.queue("+2348030000001", "code 1")
+            self.dispatcher.queue("+2348030000001", "code 2")
+            self.dispatcher.queue("+2348030000002", "code 3")
+
+        self.assertTrue(self.dispatcher.flush(timeout=5))
+        self.assertEqual(
+            sorted(sms.outbox),
+            [("+2348030000001", "code 2"), ("+2348030000002", "code 3")],
+        )
+
+    def test_failed_sends_are_retried(self):
+        failures.extend([ConnectionError(), ConnectionError()])
+
+        with self.assertLogs("src.sms", "WARNING") as logs:
+            self.dispatcher.queue("+2348030000001", "code 1")
+            self.assertTrue(self.dispatcher.flush(timeout=5))
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(sms.outbox, [("+2348030000001", "code 1")])
+
+    def test_gives_up_after_max_attempts(self):
+        failures.extend([ConnectionError()] * 3)
+
+        with self.assertLogs("src.sms", "ERROR"):
+            self.dispatcher.queue("+2348030000001", "code 1")
+            self.assertTrue(self.dispatcher.flush(timeout=5))
+        self.assertEqual(sms.outbox, [])
+
+
+@override_settings(SMS_BACKEND="authentication.tests.test_sms.HeldSMSBackend")
+class OTPDeliveryTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        sms.outbox.clear()
+        held.clear()
+        self.addCleanup(held.set)
+        self.user = User.objects.create_user(
+            email="johndoe@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000001",
+            role="customer",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_otp_request_does_not_wait_for_the_sms(self):
+        response = self.client.post("/api/v1/otp/verification/", {}, format="json")
+
+        self.assertEqual(response.data["message"], "OTP sent successfully")
+        self.assertEqual(sms.outbox, [])
+
+        held.set()
+        self.assertTrue(sms.dispatcher.flush(timeout=5))
+        [(to, body)] = sms.outbox
+        self.assertEqual(to, "+2348030000001")
+        code = body.split()[5].rstrip(",")
+        response = self.client.post(
+            "/api/v1/otp/verification/", {"otp": code}, format="json"
+        )
+        self.assertEqual(response.data["message"], "OTP Code Verified")
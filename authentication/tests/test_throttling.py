@@ -0,0 +1,104 @@
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+from src.throttling import IPRateThrottle, parse_rate
+
+RATES = {
+    "login.ip": "3/min",
+    "login.identity": "2/min",
+    "password_reset.ip": "10/min",
+    "password_reset.identity": "1/min",
+}
+
+
+@override_settings(
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": RATES}
+)
+class TokenBucketThrottleTest(APITestCase):
+    url = "/api/v1/customer/login/"
+
+    def setUp(self):
+        cache.clear()
+        for index, email in enumerate(("a@example.com", "b@example.com")):
+            User.objects.create_user(
+                email=email,
+                password="Password1!",
+                phone_number=f"+234803000000{index}",
+                role="customer",
+                location="Lagos",
+            )
+
+    def login(self, email, ip="10.0.0.1"):
+        return self.client.post(
+            self.url, {"email": email, "password": "wrong"}, REMOTE_ADDR=ip
+        )
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/min"), (10, 60))
+        self.assertEqual(parse_rate("100/hour"), (100, 3600))
+
+    def test_burst_is_rejected_with_retry_after(self):
+        for _ in range(2):
+            self.assertNotEqual(self.login("a@example.com").status_code, 429)
+        response = self.login("a@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def test_account_bucket_holds_across_addresses(self):
+        self.login("a@example.com", ip="10.0.0.1")
+        self.login("a@example.com", ip="10.0.0.2")
+        self.assertEqual(self.login("a@example.com", ip="10.0.0.3").status_code, 429)
+        self.assertNotEqual(self.login("b@example.com", ip="10.0.0.4").status_code, 429)
+
+    def test_address_bucket_holds_across_accounts(self):
+        self.login("a@example.com")
+        self.login("a@example.com")
+        self.login("b@example.com")
+        self.assertEqual(self.login("b@example.com").status_code, 429)
+
+    def test_bucket_refills(self):
+        with mock.patch("src.throttling.time.time", return_value=1000.0):
+            self.login("a@example.com")
+            self.login("a@example.com")
+            self.assertEqual(self.login("a@example.com").status_code, 429)
+        # one token every 30 seconds
+        with mock.patch("src.throttling.time.time", return_value=1031.0):
+            self.assertNotEqual(self.login("a@example.com").status_code, 429)
+            self.assertEqual(self.login("a@example.com").status_code, 429)
+
+    def test_rejected_before_touching_the_database(self):
+        self.login("a@example.com")
+        self.login("a@example.com")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.login("a@example.com").status_code, 429)
+
+    def test_password_reset_is_throttled_per_email(self):
+        url = "/api/v1/reset-password-email"
+        self.client.post(url, {"email": "a@example.com"})
+        response = self.client.post(url, {"email": "A@Example.com "})
+        self.assertEqual(response.status_code, 429)
+
+    def test_contended_bucket_waits_for_the_lock(self):
+        throttle = IPRateThrottle()
+        throttle.cache.add("bucket:lock", "other", timeout=1)
+        release = threading.Timer(0.05, throttle.cache.delete, args=["bucket:lock"])
+        release.start()
+
+        self.assertTrue(throttle.consume("bucket", 10, 60))
+        release.join()
+
+    def test_lock_taken_over_by_another_request_is_kept(self):
+        throttle = IPRateThrottle()
+        lock = throttle.acquire("bucket:lock")
+        # the lock expired and another request took it
+        throttle.cache.set("bucket:lock", "other")
+
+        throttle.release(*lock)
+
+        self.assertEqual(throttle.cache.get("bucket:lock"), "other")
@@ -0,0 +1,115 @@
+import time
+from unittest import mock
+
+import jwt
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.models import User
+from src.tokens import (
+    CACHED_USER_FIELDS,
+    ClaimsCache,
+    claims_cache,
+    decode_token,
+    user_cache_key,
+)
+from src.utils import Utils
+
+
+class ClaimsCacheTests(TestCase):
+    def test_cache_is_bounded(self):
+        claims = ClaimsCache(maxsize=2)
+        exp = time.time() + 60
+        for key in (b"a", b"b", b"c"):
+            claims.put(key, {"exp": exp}, time.time())
+
+        self.assertEqual(len(claims), 2)
+        self.assertIsNone(claims.get(b"a", time.time()))
+
+    def test_expired_claims_are_evicted(self):
+        claims = ClaimsCache(maxsize=2)
+        claims.put(b"a", {"exp": time.time() + 1}, time.time())
+
+        self.assertIsNone(claims.get(b"a", time.time() + 2))
+        self.assertEqual(len(claims), 0)
+
+
+class TokenDecodeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        claims_cache.clear()
+        self.user = User.objects.create_user(
+            email="johndoe@skill4cash.com",
+            password="Password1!",
+            phone_number="+2348030000001",
+            role="customer",
+        )
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def test_token_is_verified_once(self):
+        """
+        A token presented again should be served from the claims cache.
+        """
+        with mock.patch("src.tokens.jwt.decode", wraps=jwt.decode) as decode:
+            decode_token(self.refresh)
+            decode_token(self.refresh)
+
+        self.assertEqual(decode.call_count, 1)
+
+    def test_cached_claims_are_not_shared(self):
+        decode_token(self.refresh)["user_id"] = 0
+
+        self.assertEqual(decode_token(self.refresh)["user_id"], str(self.user.id))
+
+    def test_repeated_refresh_skips_the_database(self):
+        Utils.refresh_token(self.refresh)
+
+        with self.assertNumQueries(0):
+            response = Utils.refresh_token(self.refresh)
+
+        self.assertIn("access", response)
+
+    def test_saving_user_invalidates_cached_user(self):
+        Utils.get_token_user(self.refresh)
+        self.user.is_verified = True
+        self.user.save()
+
+        response = Utils.get_token_user(self.refresh)
+
+        self.assertTrue(response["user"].is_verified)
+
+    def test_invalid_token_is_rejected(self):
+        self.assertEqual(Utils.refresh_token("not-a-token"), {"error": "Invalid token"})
+
+    def test_cached_user_leaves_out_the_password(self):
+        Utils.get_token_user(self.refresh)
+
+        cached = cache.get(user_cache_key(self.user.id))
+
+        self.assertNotIn(self.user.password, cached)
+        self.assertEqual(len(cached), len(CACHED_USER_FIELDS))
+
+    def test_saving_cached_user_keeps_other_fields(self):
+        user = Utils.get_token_user(self.refresh)["user"]
+        user.phone_verification = True
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.phone_verification)
+        self.assertTrue(self.user.check_password("Password1!"))
+
+    def test_saving_cached_user_bumps_updated_at(self):
+        updated_at = self.user.updated_at
+        user = Utils.get_token_user(self.refresh)["user"]
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.updated_at, updated_at)
+
+    def test_uncached_fields_are_not_lazy_loaded(self):
+        user = Utils.get_token_user(self.refresh)["user"]
+
+        with self.assertNumQueries(0), self.assertRaises(FieldError):
+            user.first_name
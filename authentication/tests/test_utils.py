@@ -1,11 +1,13 @@
-from src.utils import send_otp, otp_session
+from src.otp import otp_store
+from src.utils import send_otp, issue_otp
 from authentication.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 import unittest
 
 
 class SendOtpTest(unittest.TestCase):
 
+	@override_settings(SMS_BACKEND="src.sms.LocmemSMSBackend")
 	def test_send_otp_function(self):
 		"""
 		Should send an Otp code if there is no
@@ -29,22 +31,26 @@ class SendOtpTest(unittest.TestCase):
 		self.assertIsNone(result)
 
 
-class  OtpSessionTests(TestCase):
-	
-	def test_otp_session_function(self):
+@override_settings(SMS_BACKEND="src.sms.LocmemSMSBackend")
+class  IssueOtpTests(TestCase):
+
+	def setUp(self):
+		self.user = User(email="johndoe@skill4cash.com")
+
+	def test_issue_otp_function(self):
 		"""
-			Should return True after populating a request session 
-			with otp code and number respectively if there is no  
-			connnection error.
+			Should return True after storing the otp code for the
+			user and number if there is no connnection error.
 		"""
-		result = otp_session(self.client, "+234000000000")
+		result = issue_otp(self.user, "+234000000000")
 		self.assertTrue(result)
+		self.assertIsNotNone(otp_store.cache.get(otp_store.key(self.user, "+234000000000")))
 
-	def test_otp_session_function_wrong(self):
+	def test_issue_otp_function_wrong(self):
 		"""
 			Should return None if no phone number was given.
 		"""
-		result = otp_session(self.client, False)
+		result = issue_otp(self.user, False)
 
 		self.assertFalse(result)
 		self.assertIsNone(None)
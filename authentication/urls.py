@@ -1,10 +1,13 @@
 from django.urls import path
 
 from .views import (
+    CustomerExport,
     CustomerRegisterGetAll,
     CustomerRetrieveUpdateDelete,
+    ServiceProviderExport,
     ServiceProviderLogin,
     ServiceProviderRegister,
+    ServiceProviderSearch,
     ServiceProviderRetrieveUpdateDelete,
     VerifyEmail,
     VerifyPhone,
@@ -22,8 +25,11 @@ from .views import (
 
 urlpatterns = [
     path("customers/", CustomerRegisterGetAll.as_view()),
+    path("customers/export/", CustomerExport.as_view(), name="customer-export"),
     path("customers/<str:id>/", CustomerRetrieveUpdateDelete.as_view()),
     path("sp/register/", ServiceProviderRegister.as_view()),
+    path("sp/export/", ServiceProviderExport.as_view(), name="sp-export"),
+    path("sp/search/", ServiceProviderSearch.as_view(), name="sp-search"),
     path("sp/<str:id>/", ServiceProviderRetrieveUpdateDelete.as_view()),
     path("otp/update/", UpdatePhone.as_view(), name="UpdatePhone"),
     path("otp/verification/", VerifyPhone.as_view(), name="VerifyPhone"),
@@ -33,7 +39,7 @@ urlpatterns = [
     path("login/google/", GoogleLogin.as_view()),
     path("verify-email/", VerifyEmail.as_view(), name="verify_email"),
     path("change-password", ChangePassword.as_view()),
-    path("reset-password", ResetPassword.as_view()),
+    path("reset-password", ResetPassword.as_view(), name="reset_password"),
     path("reset-password-email", ResetPasswordEmail.as_view()),
     # populating
     path(
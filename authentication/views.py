@@ -7,17 +7,31 @@ from decouple import config
 from dj_rest_auth.registration.views import SocialLoginView
 from django.conf import settings
 from django.contrib.auth import authenticate
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
 from django.shortcuts import get_list_or_404
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken
+from src.asyncviews import AsyncAPIView, database_sync_to_async
+from src.conditional import conditional_response, make_etag
+from src.export import EXPORT_FORMATS, export_response
+from src.fieldsets import project, sparse_fieldset
 from src.permissions import IsOwnerOrReadOnly
-from src.utils import Utils, otp_session
+from src.otp import otp_store
+from src.pagination import KeysetPagination
+from src.throttling import IdentityRateThrottle, IPRateThrottle
+from src.utils import Utils, issue_otp
 from src.utils import Utils
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from services.profiles import forget_profile
 
 from .models import User
 from .permissions import PostReadAllPermission
@@ -36,13 +50,57 @@ from .serializers import (
 http_protocol = config("HTTP")
 
 
-class CustomerRegisterGetAll(APIView):
+def register_user(serializer, request):
+    """
+    Validate and save a registration and queue its verification email,
+    in one go so async views hop to a database thread only once.
+    Returns the response data and status.
+    """
+    if not serializer.is_valid():
+        return serializer.errors, status.HTTP_400_BAD_REQUEST
+
+    with transaction.atomic():
+        user = serializer.save()
+        token = AccessToken.for_user(user)
+        relative_link = reverse("verify_email")
+        current_site = request.get_host()
+        absolute_url = f"{http_protocol}{current_site}{relative_link}?token={str(token)}"
+        email_body = f"""
+                    <h2>Hi, <small>{user.first_name}</small></h2>    
+                    <h4>Use the link below to verify your email.</h4>
+                    <p>{absolute_url}</p>
+                    """
+
+        data = {
+            "email_subject": "Verify your email",
+            "email_body": email_body,
+            "to_email": user.email,
+        }
+
+        # delivered by the send_queued_emails worker once committed
+        Utils.queue_email(data)
+
+    return_data = dict(serializer.data)
+    return_data["verification_link"] = absolute_url
+    return return_data, status.HTTP_201_CREATED
+
+
+class CustomerRegisterGetAll(AsyncAPIView):
     permission_classes = (PostReadAllPermission,)
     serializer_class = CustomerRegistrationSerializer
 
     def get(self, request):
-        users_objs = get_list_or_404(User, role="customer")
-        users_serilizer = CustomerRegistrationSerializer(users_objs, many=True)
+        fields = sparse_fieldset(request, CustomerRegistrationSerializer)
+        users_objs = get_list_or_404(
+            project(
+                User.objects.filter(role="customer"),
+                CustomerRegistrationSerializer,
+                fields,
+            )
+        )
+        users_serilizer = CustomerRegistrationSerializer(
+            users_objs, many=True, context={"fields": fields}
+        )
         data = {
             "message": "Successfully retrieved customers",
             "data": users_serilizer.data,
@@ -50,58 +108,40 @@ class CustomerRegisterGetAll(APIView):
         return Response(data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(request_body=serializer_class)
-    def post(self, request):
+    async def post(self, request):
         serializer = CustomerRegistrationSerializer(data=request.data)
-
-        if serializer.is_valid():
-            serializer.save()
-
-            user_data = serializer.data
-            user = User.objects.get(email=user_data["email"])
-            token = RefreshToken.for_user(user).access_token
-            relative_link = reverse("verify_email")
-            current_site = request.get_host()
-            absolute_url = (
-                f"{http_protocol}{current_site}{relative_link}?token={str(token)}"
-            )
-            email_body = f"""
-                        <h2>Hi, <small>{user.first_name}</small></h2>    
-                        <h4>Use the link below to verify your email.</h4>
-                        <p>{absolute_url}</p>
-                        """
-
-            data = {
-                "email_subject": "Verify your email",
-                "email_body": email_body,
-                "to_email": user.email,
-            }
-
-            # result a message id, if sent successfully
-            Utils.sending_email(data)
-
-            return_data = dict(serializer.data)
-            return_data["verification_link"] = absolute_url
-
-            return Response(return_data, status=status.HTTP_201_CREATED)
-        else:
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data, response_status = await database_sync_to_async(register_user)(
+            serializer, request
+        )
+        return Response(data, status=response_status)
 
 
 class CustomerRetrieveUpdateDelete(APIView):
     serializer_class = CustomerSerializer
     permission_classes = (IsAuthenticated,)
 
-    def get_object(self, id):
+    def get_object(self, id, fields=None):
         try:
-            return User.objects.get(pk=id)
+            return project(
+                User.objects.all(), CustomerSerializer, fields, always=("updated_at",)
+            ).get(pk=id)
         except User.DoesNotExist:
             return None
 
     def get(self, request, id):
-
-        if customer := self.get_object(id):
-            serializer = CustomerSerializer(customer)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = sparse_fieldset(request, CustomerSerializer)
+
+        if customer := self.get_object(id, fields):
+            # ETag only: Last-Modified has whole seconds, so an edit in the
+            # same second as the last fetch would get a stale 304
+            return conditional_response(
+                request,
+                lambda: Response(
+                    CustomerSerializer(customer, context={"fields": fields}).data,
+                    status=status.HTTP_200_OK,
+                ),
+                etag=make_etag(customer.id, customer.updated_at, fields),
+            )
         else:
             return Response(
                 {"message": "Invalid User ID"}, status=status.HTTP_404_NOT_FOUND
@@ -135,7 +175,7 @@ class CustomerRetrieveUpdateDelete(APIView):
             )
 
 
-class ServiceProviderRegister(APIView):
+class ServiceProviderRegister(AsyncAPIView):
     serializer_class = ServiceProviderRegistrationSerializer
     # permission_classes = (PostReadAllPermission,)
 
@@ -149,63 +189,147 @@ class ServiceProviderRegister(APIView):
         return Response(data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(request_body=serializer_class)
-    def post(self, request):
+    async def post(self, request):
         serializer = ServiceProviderRegistrationSerializer(data=request.data)
+        data, response_status = await database_sync_to_async(register_user)(
+            serializer, request
+        )
+        return Response(data, status=response_status)
+
+
+class UserExport(APIView):
+    """Nightly ops export of every user of one role, streamed as NDJSON or CSV."""
+
+    permission_classes = (IsAdminUser,)
+    role = None
+    fields = (
+        "id",
+        "email",
+        "first_name",
+        "last_name",
+        "phone_number",
+        "location",
+        "is_verified",
+        "email_verification",
+        "phone_verification",
+        "date_joined",
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "output",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                enum=list(EXPORT_FORMATS),
+                default="ndjson",
+            )
+        ]
+    )
+    def get(self, request):
+        # not ?format=, which DRF reserves for renderer selection
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"message": f"output must be one of {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        if serializer.is_valid():
-            serializer.save()
-            user_data = serializer.data
+        users = User.objects.filter(role=self.role).order_by("date_joined", "id")
+        return export_response(users, self.fields, output, filename=f"{self.role}s")
 
-            user = User.objects.get(email=user_data["user"]["email"])
 
-            token = RefreshToken.for_user(user).access_token
+class CustomerExport(UserExport):
+    role = "customer"
 
-            relative_link = reverse("verify_email")
 
-            current_site = request.get_host()
+class ServiceProviderExport(UserExport):
+    role = "service_provider"
+    fields = UserExport.fields + (
+        "business_name",
+        "service_category",
+        "keywords",
+        "is_verified_business",
+        "rating_summary__count",
+        "rating_summary__total",
+    )
 
-            absolute_url = (
-                f"{http_protocol}{current_site}{relative_link}?token={str(token)}"
-            )
 
-            email_body = f"""
-                        <h2>Hi, <small>{user.first_name}</small></h2>    
-                        <h4>Use the link below to verify your email.</h4>
-                        <p>{absolute_url}</p>
-
-                        """
-            data = {
-                "email_subject": "Verify your email",
-                "email_body": email_body,
-                "to_email": user.email,
-            }
-
-            # result a message id, if sent successfully
-            Utils.sending_email(data)
+class ServiceProviderSearch(APIView):
+    permission_classes = (AllowAny,)
 
-            return_data = dict(serializer.data)
-            return_data["verification_link"] = absolute_url
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING)
+        ]
+    )
+    def get(self, request):
+        terms = request.query_params.get("q", "").strip()
+        if not terms:
+            return Response(
+                {"message": "Provide search terms with ?q="},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            return Response(return_data, status=status.HTTP_201_CREATED)
-        else:
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        query = SearchQuery(terms, config="english", search_type="websearch")
+        providers = (
+            User.objects.filter(role="service_provider", search_vector=query)
+            # ts_rank is a float4; as a double it survives the cursor round trip
+            .annotate(
+                rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+            ).select_related("rating_summary")
+        )
+        fields = sparse_fieldset(request, ServiceProviderSerializer)
+        paginator = KeysetPagination(ordering=("-rank", "id"), page_size=20)
+        page = paginator.paginate_queryset(
+            project(providers, ServiceProviderSerializer, fields, paginator.ordering),
+            request,
+            view=self,
+        )
+        serializer = ServiceProviderSerializer(
+            page, many=True, context={"fields": fields}
+        )
+        return paginator.get_paginated_response(serializer.data)
 
 
 class ServiceProviderRetrieveUpdateDelete(APIView):
     serializer_class = ServiceProviderSerializer
     # permission_classes = (IsAuthenticated,)
 
-    def get_object(self, id):
+    def get_object(self, id, fields=None):
         try:
-            return User.objects.get(pk=id)
+            return project(
+                User.objects.select_related("rating_summary"),
+                ServiceProviderSerializer,
+                fields,
+                always=("updated_at", "rating_summary"),
+            ).get(pk=id)
         except User.DoesNotExist:
             return None
 
     def get(self, request, id):
-
-        if service_provider := self.get_object(id):
-            serializer = ServiceProviderSerializer(service_provider)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = sparse_fieldset(request, ServiceProviderSerializer)
+
+        if service_provider := self.get_object(id, fields):
+            # the body embeds the rating summary, so it is part of the version
+            summary = getattr(service_provider, "rating_summary", None)
+            summary_updated_at = summary.updated_at if summary else None
+            # ETag only, as for customers
+            return conditional_response(
+                request,
+                lambda: Response(
+                    ServiceProviderSerializer(
+                        service_provider, context={"fields": fields}
+                    ).data,
+                    status=status.HTTP_200_OK,
+                ),
+                etag=make_etag(
+                    service_provider.id,
+                    service_provider.updated_at,
+                    summary_updated_at,
+                    fields,
+                ),
+            )
         else:
             return Response(
                 {"message": "Invalid User ID", "status": status.HTTP_404_NOT_FOUND}
@@ -271,140 +395,73 @@ class VerifyEmail(APIView):
             )
 
 
-class VerifyPhone(APIView):
+class VerifyPhone(AsyncAPIView):
     serializer_class = VerificationSerializer
     permission_classes = (IsAuthenticated,)
+    throttle_classes = (IPRateThrottle, IdentityRateThrottle)
+    throttle_scope = "otp"
 
     @swagger_auto_schema(request_body=serializer_class)
-    def post(self, request):
+    async def post(self, request):
 
         otp_code = request.data.get("otp")
-        user = User.objects.get(id=request.user.id)
-        phone_number = user["phone_number"]
+        user = request.user
+        phone_number = str(user.phone_number)
 
-        try:
-            if not user.phone_verification:
-                if not "code" in request.session.keys():
-                    sent_otp = otp_session(request, phone_number)
-                    if sent_otp:
-                        return Response(
-                            {
-                                "status": status.HTTP_200_OK,
-                                "message": "OTP sent successfully",
-                            }
-                        )
-                    return Response(
-                        {
-                            "status": status.HTTP_400_BAD_REQUEST,
-                            "message": "Sending OTP Error",
-                        }
-                    )
-                else:
-                    if otp_code:
-                        if str(otp_code) == str(request.session["code"]):
-                            user.phone_verification = True
-                            user.save()
-
-                            request.session.clear()
-                            return Response(
-                                {
-                                    "status": status.HTTP_200_OK,
-                                    "message": "OTP Code Verified",
-                                }
-                            )
-                        request.session.clear()
-                        return Response(
-                            {
-                                "status": status.HTTP_400_BAD_REQUEST,
-                                "message": "OTP Incorrect!",
-                            }
-                        )
-                    request.session.clear()
-                    return Response(
-                        {
-                            "status": status.HTTP_400_BAD_REQUEST,
-                            "message": "Invalid OTP!",
-                        }
-                    )
+        if user.phone_verification:
             return Response(
                 {
                     "status": status.HTTP_403_FORBIDDEN,
                     "message": "Phone number already validated",
                 }
             )
-        except jwt.ExpiredSignatureError:
+
+        if not otp_code:
+            if await database_sync_to_async(issue_otp)(user, phone_number):
+                return Response(
+                    {
+                        "status": status.HTTP_200_OK,
+                        "message": "OTP sent successfully",
+                    }
+                )
             return Response(
                 {
                     "status": status.HTTP_400_BAD_REQUEST,
-                    "message": "Verification link expired",
+                    "message": "Sending OTP Error",
                 }
             )
-        except jwt.exceptions.DecodeError:
+
+        result = await database_sync_to_async(otp_store.verify)(
+            user, phone_number, otp_code
+        )
+        if result["status"]:
+            user.phone_verification = True
+            await database_sync_to_async(user.save)(
+                update_fields=["phone_verification", "updated_at"]
+            )
             return Response(
-                {
-                    "status": status.HTTP_400_BAD_REQUEST,
-                    "message": "Invalid token",
-                }
+                {"status": status.HTTP_200_OK, "message": result["message"]}
             )
+        return Response(
+            {"status": status.HTTP_400_BAD_REQUEST, "message": result["message"]}
+        )
 
 
-class UpdatePhone(APIView):
+class UpdatePhone(AsyncAPIView):
     serializer_class = UpdatePhoneSerializer
     permission_classes = (IsAuthenticated,)
+    throttle_classes = (IPRateThrottle, IdentityRateThrottle)
+    throttle_scope = "otp"
 
     @swagger_auto_schema(request_body=serializer_class)
-    def post(self, request):
+    async def post(self, request):
 
         otp_code, new_number = request.data.get("otp"), request.data.get("number")
-        user = User.objects.get(id=request.user.id)
-        try:
-            if not User.objects.filter(phone_number__iexact=new_number).exists():
-
-                if not "code" in request.session.keys():
-                    sent_otp = otp_session(request, new_number)
-                    if sent_otp:
-                        return Response(
-                            {
-                                "status": status.HTTP_200_OK,
-                                "message": "OTP sent successfully",
-                            }
-                        )
-                    return Response(
-                        {
-                            "status": status.HTTP_400_BAD_REQUEST,
-                            "message": "Sending OTP Error",
-                        }
-                    )
-
-                else:
-                    if otp_code:
-                        if str(otp_code) == str(request.session["code"]):
-                            user.phone_verification = True
-                            user.phone_number = new_number
-                            user.save()
-
-                            request.session.clear()
-                            return Response(
-                                {
-                                    "status": status.HTTP_200_OK,
-                                    "message": "OTP Code Verified",
-                                }
-                            )
-                        request.session.clear()
-                        return Response(
-                            {
-                                "status": status.HTTP_400_BAD_REQUEST,
-                                "message": "OTP Incorrect!",
-                            }
-                        )
-                    request.session.clear()
-                    return Response(
-                        {
-                            "status": status.HTTP_400_BAD_REQUEST,
-                            "message": "Invalid OTP!",
-                        }
-                    )
+        user = request.user
 
+        if await database_sync_to_async(
+            User.objects.filter(phone_number__iexact=new_number).exists
+        )():
             return Response(
                 {
                     "status": status.HTTP_403_FORBIDDEN,
@@ -412,24 +469,44 @@ class UpdatePhone(APIView):
                 }
             )
 
-        except jwt.ExpiredSignatureError:
+        if not otp_code:
+            if await database_sync_to_async(issue_otp)(user, new_number):
+                return Response(
+                    {
+                        "status": status.HTTP_200_OK,
+                        "message": "OTP sent successfully",
+                    }
+                )
             return Response(
                 {
                     "status": status.HTTP_400_BAD_REQUEST,
-                    "message": "Verification link expired",
+                    "message": "Sending OTP Error",
                 }
             )
-        except jwt.exceptions.DecodeError:
+
+        result = await database_sync_to_async(otp_store.verify)(
+            user, new_number, otp_code
+        )
+        if result["status"]:
+            user.phone_verification = True
+            user.phone_number = new_number
+            await database_sync_to_async(user.save)(
+                update_fields=["phone_verification", "phone_number", "updated_at"]
+            )
             return Response(
-                {
-                    "status": status.HTTP_400_BAD_REQUEST,
-                    "message": "Invalid token",
-                }
+                {"status": status.HTTP_200_OK, "message": result["message"]}
             )
+        return Response(
+            {"status": status.HTTP_400_BAD_REQUEST, "message": result["message"]}
+        )
 
 
 class CustomerLogin(APIView):
     serializer_class = LoginSerializer
+    # no token needed, and none is checked before the throttles
+    authentication_classes = ()
+    throttle_classes = (IPRateThrottle, IdentityRateThrottle)
+    throttle_scope = "login"
 
     def post(self, request):
         if "email" not in request.data.keys() or "password" not in request.data.keys():
@@ -470,6 +547,10 @@ class CustomerLogin(APIView):
 
 class ServiceProviderLogin(APIView):
     serializer_class = LoginSerializer
+    # no token needed, and none is checked before the throttles
+    authentication_classes = ()
+    throttle_classes = (IPRateThrottle, IdentityRateThrottle)
+    throttle_scope = "login"
 
     def post(self, request):
         if "email" not in request.data.keys() or "password" not in request.data.keys():
@@ -558,7 +639,7 @@ class PopulateUser(APIView):
                     first_name=names[0],
                     last_name=names[1],
                     phone_number=f"090{x}-000-000{x}",
-                    _is_verified=choice([False, True]),
+                    is_verified=choice([False, True]),
                     role=choice(role),
                     location=choice(location),
                 )
@@ -579,15 +660,21 @@ class PopulateSP(APIView):
             "Promoter",
             "Teacher",
         ]
-        sp = User.objects.filter(role="service_provider")
-
-        if not User.objects.all():
-            for x in range(sp.count()):
-                User.objects.create(
-                    user=sp[x],
-                    business_name=name[x],
-                    is_verified_business=choice([False, True]),
-                )
+        sp = list(User.objects.filter(role="service_provider", business_name=None))
+
+        now = timezone.now()
+        for service_provider in sp:
+            # business names are unique, so the id keeps them apart
+            service_provider.business_name = f"{choice(name)} {service_provider.pk}"
+            service_provider.is_verified_business = choice([False, True])
+            service_provider.updated_at = now
+        with transaction.atomic():
+            # bulk updates send no post_save, so the profiles are dropped here;
+            # the search vector follows business_name through its trigger
+            User.objects.bulk_update(
+                sp, ["business_name", "is_verified_business", "updated_at"]
+            )
+            transaction.on_commit(lambda: forget_profile(*(user.pk for user in sp)))
 
         return Response({"message": "SP data populated sucessfully."})
 
@@ -596,7 +683,8 @@ class ChangePassword(APIView):
     permission_classes = (IsAuthenticated, IsOwnerOrReadOnly)
 
     def get(self, request):
-        user = request.user
+        # request.user only carries the cached authentication fields
+        user = User.objects.get(pk=request.user.pk)
         serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -644,14 +732,19 @@ class ChangePassword(APIView):
             )
 
 
-class ResetPasswordEmail(APIView):
+class ResetPasswordEmail(AsyncAPIView):
     permission_classes = (AllowAny,)
+    # no token needed, and none is checked before the throttles
+    authentication_classes = ()
+    throttle_classes = (IPRateThrottle, IdentityRateThrottle)
+    throttle_scope = "password_reset"
 
-    def post(self, request):
+    async def post(self, request):
         email = request.data["email"]
-        if User.objects.filter(email=email).exists():
-            user = User.objects.get(email=email)
-
+        user = await database_sync_to_async(
+            User.objects.filter(email=email).first
+        )()
+        if user is not None:
             relative_link = reverse("reset_password")
 
             current_site = request.get_host()
@@ -669,7 +762,7 @@ class ResetPasswordEmail(APIView):
                 "to_email": user.email,
             }
 
-            Utils.sending_email(data)
+            await database_sync_to_async(Utils.queue_email)(data)
 
             return Response(
                 {
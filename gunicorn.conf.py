@@ -0,0 +1,11 @@
+import decouple
+
+# uvicorn workers serving src.asgi when ASGI_MODE is set, sync workers otherwise.
+# (gunicorn reads every module-level name here as a setting, and `config` is one)
+if decouple.config("ASGI_MODE", default=False, cast=bool):
+    wsgi_app = "src.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "src.wsgi:application"
+
+timeout = 30
@@ -0,0 +1,53 @@
+from itertools import groupby
+from operator import itemgetter
+
+from .models import MAX_SCHEDULE_DURATION, Schedule
+
+
+def free_slots(bookings, start, end, min_length):
+    """
+    Gaps of at least `min_length` inside [start, end) left between
+    `bookings`, an iterable of (begins, ends) pairs sorted by begins.
+    Overlapping bookings are merged on the fly in a single pass.
+    """
+    cursor = start
+    for begins, ends in bookings:
+        if begins >= end:
+            break
+        if begins - cursor >= min_length:
+            yield cursor, begins
+        cursor = max(cursor, ends)
+    if end - cursor >= min_length:
+        yield cursor, end
+
+
+def bookings_overlapping(service_provider_ids, start, end):
+    """
+    (service_provider, date_and_time, duration) of every booking that can
+    overlap [start, end), read through the (service_provider, date_and_time)
+    index so the cost follows the window, not the provider's history.
+    """
+    return (
+        Schedule.objects.filter(
+            service_provider__in=service_provider_ids,
+            date_and_time__gt=start - MAX_SCHEDULE_DURATION,
+            date_and_time__lt=end,
+        )
+        .order_by("service_provider", "date_and_time")
+        .values_list("service_provider", "date_and_time", "duration")
+    )
+
+
+def availability(service_provider_ids, start, end, min_length):
+    """Free windows of at least `min_length` per provider, in one query."""
+    rows = bookings_overlapping(service_provider_ids, start, end)
+    booked = {
+        service_provider: [(begins, begins + duration) for _, begins, duration in group]
+        for service_provider, group in groupby(rows.iterator(), key=itemgetter(0))
+    }
+    return {
+        service_provider: list(
+            free_slots(booked.get(service_provider, []), start, end, min_length)
+        )
+        for service_provider in service_provider_ids
+    }
@@ -0,0 +1,48 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+from .models import Category
+
+VERSION_KEY = "categories:version"
+LIST_TTL = 24 * 60 * 60  # old versions age out on their own
+
+
+def new_version():
+    # never reused, so an evicted version key cannot bring back a stale list
+    return time.time_ns()
+
+
+def category_version():
+    if (version := cache.get(VERSION_KEY)) is None:
+        version = new_version()
+        cache.add(VERSION_KEY, version, timeout=None)
+        # another process may have added its own first
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def bump_category_version():
+    """Invalidate the cached list; called on every Category write."""
+    cache.set(VERSION_KEY, new_version(), timeout=None)
+
+
+def category_list():
+    """
+    (etag, names) of every category. The list is built once per version
+    and kept with its ETag, so a warm hit costs two cache reads and no
+    query. The ETag is a digest of the names rather than the version, so
+    clients keep their 304s when an evicted version key is replaced.
+    """
+    key = f"categories:v{category_version()}"
+    if entry := cache.get(key):
+        return entry
+
+    names = list(Category.objects.order_by("name").values_list("name", flat=True))
+    digest = hashlib.sha1(json.dumps(names).encode()).hexdigest()
+    entry = (quote_etag(digest), names)
+    cache.set(key, entry, timeout=LIST_TTL)
+    return entry
@@ -0,0 +1,178 @@
+import json
+import timeit
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import compress_string
+from phonenumber_field.phonenumber import to_python
+from rest_framework.renderers import JSONRenderer
+
+from authentication.models import User
+from authentication.serializers import ServiceProviderSerializer
+from services.models import Rating, Schedule
+from services.serializers import RatingSerializer, ScheduleSerializer
+from src.renderers import ORJSONRenderer
+from src.tokens import claims_cache
+from src.utils import Utils
+
+from .seed_data import SEED_DOMAIN
+
+BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+def benchmarks(rows):
+    """
+    (name, callable) of every hot path we time. Everything a case needs
+    from the database is loaded up front, so only the serializer or
+    helper itself is measured, except where a query is part of the path.
+    """
+    customer = User.objects.filter(
+        role="customer", email__endswith=f"@{SEED_DOMAIN}"
+    ).first()
+    if customer is None:
+        raise CommandError("No seeded users found, run seed_data first")
+    tokens = Utils.create_token(email=customer.email, password="Password1!")
+    if "error" in tokens:
+        raise CommandError("Seeded users must use the default seed_data password")
+
+    yield "validate_user_password", lambda: Utils.validate_user_password("Password1!")
+    yield "validate_password", lambda: Utils.validate_password("Password1!")
+    yield "validate_email", lambda: Utils.validate_email("new.user@skill4cash.com")
+    yield "create_token", lambda: Utils.create_token(
+        email=customer.email, password="Password1!"
+    )
+    yield "refresh_token", lambda: Utils.refresh_token(tokens["refresh"])
+
+    def refresh_token_uncached():
+        claims_cache.clear()
+        Utils.refresh_token(tokens["refresh"])
+
+    yield "refresh_token uncached", refresh_token_uncached
+    yield "phone_number parse", lambda: to_python("+2348030000001")
+
+    for count in rows:
+        ratings = list(Rating.objects.order_by("rated_at")[:count])
+        schedules = list(Schedule.objects.order_by("date_and_time")[:count])
+        service_providers = list(
+            User.objects.filter(role="service_provider")
+            .select_related("rating_summary")
+            .order_by("id")[:count]
+        )
+        for queryset in (ratings, schedules, service_providers):
+            if len(queryset) < count:
+                raise CommandError(
+                    f"Need {count} rows of each kind, seed a larger data set"
+                )
+
+        yield f"RatingSerializer x{count}", (
+            lambda ratings=ratings: RatingSerializer(ratings, many=True).data
+        )
+        yield f"ScheduleSerializer x{count}", (
+            lambda schedules=schedules: ScheduleSerializer(schedules, many=True).data
+        )
+        yield f"ServiceProviderSerializer x{count}", (
+            lambda service_providers=service_providers: ServiceProviderSerializer(
+                service_providers, many=True
+            ).data
+        )
+
+        for name, data in payloads(ratings, schedules, service_providers):
+            for renderer in RENDERERS:
+                yield f"{type(renderer).__name__} {name} x{count}", (
+                    lambda renderer=renderer, data=data: renderer.render(data)
+                )
+
+
+RENDERERS = (JSONRenderer(), ORJSONRenderer())
+
+
+def payloads(ratings, schedules, service_providers):
+    """(name, data) of the review, schedule and user list responses."""
+    yield "reviews", RatingSerializer(ratings, many=True).data
+    yield "schedules", ScheduleSerializer(schedules, many=True).data
+    yield "users", ServiceProviderSerializer(service_providers, many=True).data
+
+
+def wire_sizes(rows):
+    """(name, bytes as JSON, bytes once gzipped) of every list response."""
+    for count in rows:
+        ratings = Rating.objects.order_by("rated_at")[:count]
+        schedules = Schedule.objects.order_by("date_and_time")[:count]
+        service_providers = (
+            User.objects.filter(role="service_provider")
+            .select_related("rating_summary")
+            .order_by("id")[:count]
+        )
+        for name, data in payloads(ratings, schedules, service_providers):
+            content = ORJSONRenderer().render(data)
+            yield f"{name} x{count}", len(content), len(compress_string(content))
+
+
+def measure(function, repeat):
+    """Best seconds per call over `repeat` runs of an autoranged loop."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def humanize(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the request hot paths against a seeded database and compare "
+        "them with the baseline kept in benchmarks/baseline.json."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[1000, 10000], metavar="N"
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--baseline", type=Path, default=BASELINE)
+        parser.add_argument(
+            "--save", action="store_true", help="Write the results as the new baseline."
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail when a case is slower than the baseline beyond --tolerance.",
+        )
+        parser.add_argument("--tolerance", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        baseline = {}
+        if options["baseline"].exists():
+            baseline = json.loads(options["baseline"].read_text())
+
+        results = {}
+        regressions = []
+        for name, function in benchmarks(options["rows"]):
+            results[name] = seconds = measure(function, options["repeat"])
+            line = f"{name:<36} {humanize(seconds):>10}"
+            if previous := baseline.get(name):
+                change = seconds / previous - 1
+                line += f" {change:+8.1%}"
+                if change > options["tolerance"]:
+                    regressions.append(name)
+                    line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        self.stdout.write(f"\n{'bytes on the wire':<36} {'json':>10} {'gzip':>10}")
+        for name, size, compressed in wire_sizes(options["rows"]):
+            self.stdout.write(f"{name:<36} {size:>10} {compressed:>10}")
+
+        if options["save"]:
+            options["baseline"].parent.mkdir(parents=True, exist_ok=True)
+            options["baseline"].write_text(
+                json.dumps(results, indent=2, sort_keys=True) + "\n"
+            )
+            self.stdout.write(self.style.SUCCESS(f"Saved {options['baseline']}"))
+
+        if options["check"] and regressions:
+            raise CommandError(f"Slower than baseline: {', '.join(regressions)}")
@@ -0,0 +1,109 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib.postgres.search import SearchQuery
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from authentication.models import User
+from services.availability import bookings_overlapping
+from services.models import LeaderboardEntry, Rating, Schedule
+from src.pagination import KeysetPagination
+
+
+def hot_queries():
+    """The filters our list and login endpoints run on every request."""
+    someone = uuid.uuid4()
+    cursor = [timezone.now().isoformat(), str(uuid.uuid4())]
+    page = 51
+
+    yield "ratings by provider", Rating.objects.filter(
+        service_provider=someone
+    ).order_by("rated_at")
+    yield "rating list page", Rating.objects.filter(
+        KeysetPagination(ordering=("rated_at", "id")).get_keyset_filter(cursor)
+    ).order_by("rated_at", "id")[:page]
+    yield "schedules by provider", Schedule.objects.filter(
+        service_provider=someone
+    ).order_by("date_and_time")
+    yield "schedules by customer", Schedule.objects.filter(
+        customer=someone
+    ).order_by("date_and_time")
+    yield "schedule list page", Schedule.objects.filter(
+        KeysetPagination(ordering=("date_and_time", "id")).get_keyset_filter(cursor)
+    ).order_by("date_and_time", "id")[:page]
+    yield "provider availability", bookings_overlapping(
+        [someone], timezone.now(), timezone.now() + timedelta(days=7)
+    )
+    # customers are most of the table, so listing them is a full read
+    # whatever the indexes; providers are the selective side of user_role_idx
+    yield "users by role", User.objects.filter(role="service_provider")
+    yield "category leaderboard page", LeaderboardEntry.objects.filter(
+        service_category="electrician", category_rank__gt=page
+    ).order_by("category_rank")[:page]
+    yield "location leaderboard page", LeaderboardEntry.objects.filter(
+        service_category="electrician", location="lagos", location_rank__gt=page
+    ).order_by("location_rank")[:page]
+    yield "provider search", User.objects.filter(
+        role="service_provider",
+        search_vector=SearchQuery("electrician lagos", config="english"),
+    )
+
+
+def explain(cursor, queryset):
+    sql, params = queryset.query.sql_with_params()
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    return cursor.fetchone()[0][0]["Plan"]
+
+
+def sequential_scans(plan):
+    """Relation names of every Seq Scan node in an EXPLAIN (FORMAT JSON) tree."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from sequential_scans(child)
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh planner statistics, EXPLAIN every hot query and fail if any "
+        "of them plans a sequential scan. Run it against a seeded database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force-index",
+            action="store_true",
+            help=(
+                "Turn enable_seqscan off, which only proves a usable index "
+                "exists, not that the planner would pick it. For databases "
+                "too small for real plans, e.g. the test database; otherwise "
+                "run against seed_data with fresh statistics."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        offenders = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            if options["force_index"]:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            else:
+                cursor.execute("ANALYZE")
+
+            for label, queryset in hot_queries():
+                plan = explain(cursor, queryset)
+                scans = sorted(set(sequential_scans(plan)))
+                if scans:
+                    offenders.append(label)
+                    self.stdout.write(
+                        self.style.ERROR(f"{label}: seq scan on {', '.join(scans)}")
+                    )
+                else:
+                    self.stdout.write(f"{label}: {plan['Node Type']}")
+
+        if offenders:
+            raise CommandError(
+                f"Sequential scans planned for: {', '.join(offenders)}"
+            )
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index"))
@@ -0,0 +1,339 @@
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PASSWORD = "Password1!"
+# the journeys never start the outbox worker and request no OTPs, so no
+# request leaves the machine; the backends are pinned anyway in case a
+# worker or an OTP request runs against the same environment
+STUB_ENV = {
+    "EMAIL_OUTBOX_BACKEND": "django.core.mail.backends.locmem.EmailBackend",
+    "SMS_BACKEND": "src.sms.LocmemSMSBackend",
+    # every virtual user logs in from the same address
+    "THROTTLE_LOGIN_IP": "1000000/s",
+}
+# a random phone number may already belong to an earlier run's user
+PHONE_ATTEMPTS = 5
+
+
+class JourneyFailed(Exception):
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint, shared by every virtual user."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self._lock = threading.Lock()
+
+    def request(self, session, label, method, url, **kwargs):
+        started = time.perf_counter()
+        response = session.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.samples[label].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[label] += 1
+        if response.status_code >= 400:
+            raise JourneyFailed(f"{label} returned {response.status_code}", response)
+        return response
+
+    def report(self, wall):
+        for label, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            yield {
+                "endpoint": label,
+                "requests": len(samples),
+                "errors": self.errors[label],
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+                "throughput": len(samples) / wall,
+            }
+
+
+def phone_taken(response):
+    return response.status_code == 400 and "phone_number" in response.json()
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, -(-len(ordered) * q // 100) - 1)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(workers, threads):
+    """
+    Run the app under gunicorn with gunicorn.conf.py, as in production, for
+    the length of the block. ASGI_MODE picks the ASGI app and worker class.
+    """
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            f"--bind=127.0.0.1:{port}",
+            f"--workers={workers}",
+            f"--threads={threads}",
+            "--log-level=warning",
+        ],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, **STUB_ENV},
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise CommandError("gunicorn did not start")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive register, verify email, login, booking and listing journeys "
+        "against a running app and report latency percentiles per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            help="Server to load. By default the app is started under gunicorn.",
+        )
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--customers", type=int, default=100)
+        parser.add_argument("--providers", type=int, default=10)
+        parser.add_argument(
+            "--bookings",
+            type=int,
+            default=2,
+            help="Schedules and reviews each customer creates.",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--output", type=Path, help="Also write the report as JSON."
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        # unique per run, so journeys never collide with earlier runs' users
+        self.run_tag = f"{self.rng.getrandbits(32):08x}"
+        self.bookings = options["bookings"]
+        self.recorder = Recorder()
+        self.failures = Counter()
+
+        if options["base_url"]:
+            self.load(options["base_url"].rstrip("/"), options)
+        else:
+            with serve(options["workers"], options["threads"]) as base_url:
+                self.load(base_url, options)
+
+    def load(self, base_url, options):
+        self.api = f"{base_url}/api/v1/"
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            providers = [
+                provider
+                for provider in pool.map(
+                    self.attempt(self.provider_journey), range(options["providers"])
+                )
+                if provider
+            ]
+            if not providers:
+                raise CommandError("No service provider could register")
+            list(
+                pool.map(
+                    self.attempt(lambda n: self.customer_journey(n, providers)),
+                    range(
+                        options["providers"],
+                        options["providers"] + options["customers"],
+                    ),
+                )
+            )
+            list(pool.map(self.attempt(self.dashboard_journey), providers))
+        wall = time.perf_counter() - started
+
+        report = list(self.recorder.report(wall))
+        self.write_report(report, wall)
+        if options["output"]:
+            options["output"].write_text(
+                json.dumps(
+                    {
+                        "wall": wall,
+                        "failures": dict(self.failures),
+                        "endpoints": report,
+                    },
+                    indent=2,
+                )
+                + "\n"
+            )
+
+    def attempt(self, journey):
+        def run(arg):
+            try:
+                return journey(arg)
+            except (JourneyFailed, requests.RequestException) as e:
+                self.failures[journey.__name__] += 1
+                self.stderr.write(str(e))
+
+        return run
+
+    def register(self, session, n, path, login_path, **fields):
+        email = f"load-{self.run_tag}-{n}@loadtest.skill4cash.com"
+        # the eight digits after +23490 (900 is no valid prefix) are too few
+        # to hold the run tag, so they are random and a taken number replaced
+        for attempt in range(1, PHONE_ATTEMPTS + 1):
+            try:
+                response = self.recorder.request(
+                    session,
+                    f"POST {path}",
+                    "post",
+                    self.api + path,
+                    json={
+                        "first_name": "Load",
+                        "last_name": f"User{n}",
+                        "email": email,
+                        "phone_number": f"+23490{self.rng.randrange(10**7, 10**8)}",
+                        "password": PASSWORD,
+                        "confirm_password": PASSWORD,
+                        "location": "Lagos",
+                        **fields,
+                    },
+                )
+                break
+            except JourneyFailed as e:
+                if attempt == PHONE_ATTEMPTS or not phone_taken(e.response):
+                    raise
+        user = response.json()
+
+        link = urlsplit(user["verification_link"])
+        self.recorder.request(
+            session,
+            "GET verify-email/",
+            "get",
+            self.api + "verify-email/",
+            params=link.query,
+        )
+
+        # the login views read form data, not JSON
+        response = self.recorder.request(
+            session,
+            f"POST {login_path}",
+            "post",
+            self.api + login_path,
+            data={"email": email, "password": PASSWORD},
+        )
+        session.headers[
+            "Authorization"
+        ] = f"Bearer {response.json()['message']['access']}"
+        return user["id"]
+
+    def provider_journey(self, n):
+        session = requests.Session()
+        provider_id = self.register(
+            session,
+            n,
+            "sp/register/",
+            "service-provider/login/",
+            business_name=f"Load {self.run_tag} {n}",
+        )
+        return provider_id, session
+
+    def customer_journey(self, n, providers):
+        session = requests.Session()
+        customer_id = self.register(session, n, "customers/", "customer/login/")
+        for _ in range(self.bookings):
+            provider_id, _ = self.rng.choice(providers)
+            when = datetime.now(dt_timezone.utc) + timedelta(
+                days=self.rng.randrange(1, 30), hours=self.rng.randrange(8, 18)
+            )
+            self.recorder.request(
+                session,
+                "POST schedule/",
+                "post",
+                self.api + "schedule/",
+                json={
+                    "title": "Meeting",
+                    "customer": customer_id,
+                    "service_provider": provider_id,
+                    "date_and_time": when.isoformat(),
+                    "detail": "Keep on update on all upcoming schedules",
+                },
+            )
+            self.recorder.request(
+                session,
+                "POST review/",
+                "post",
+                self.api + "review/",
+                json={
+                    "customer": customer_id,
+                    "service_provider": provider_id,
+                    "rating": self.rng.randrange(10),
+                    "review": "This is good :)",
+                },
+            )
+        self.recorder.request(session, "GET schedule/", "get", self.api + "schedule/")
+        self.recorder.request(session, "GET review/", "get", self.api + "review/")
+
+    def dashboard_journey(self, provider):
+        provider_id, session = provider
+        self.recorder.request(session, "GET reviews/", "get", self.api + "reviews/")
+        self.recorder.request(session, "GET schedules/", "get", self.api + "schedules/")
+        self.recorder.request(
+            session, "GET sp/<id>/", "get", self.api + f"sp/{provider_id}/"
+        )
+
+    def write_report(self, report, wall):
+        self.stdout.write(
+            f"{'endpoint':<30} {'reqs':>6} {'errors':>6} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}"
+        )
+        for row in report:
+            self.stdout.write(
+                f"{row['endpoint']:<30} {row['requests']:>6} {row['errors']:>6} "
+                f"{row['p50'] * 1000:>8.1f} {row['p95'] * 1000:>8.1f} "
+                f"{row['p99'] * 1000:>8.1f} {row['throughput']:>8.1f}"
+            )
+        total = sum(row["requests"] for row in report)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} requests in {wall:.1f}s, {total / wall:.1f} req/s"
+            )
+        )
+        for journey, count in self.failures.items():
+            self.stdout.write(self.style.ERROR(f"{count} {journey} runs failed"))
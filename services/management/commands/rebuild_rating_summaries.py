@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from services.models import RatingSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute every provider's rating summary from the Rating table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        RatingSummary.objects.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {RatingSummary.objects.count()} rating summaries"
+            )
+        )
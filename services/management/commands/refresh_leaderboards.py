@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.models import LeaderboardEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the top-rated provider leaderboards from the rating summaries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.LEADERBOARD_REFRESH_INTERVAL,
+            help="Seconds between two refreshes.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Refresh once and exit instead of looping.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            ranked = LeaderboardEntry.objects.refresh(
+                settings.LEADERBOARD_PRIOR_WEIGHT, batch_size=options["batch_size"]
+            )
+            self.stdout.write(self.style.SUCCESS(f"Ranked {ranked} providers"))
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,294 @@
+import csv
+import io
+import random
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from authentication.models import User
+from services.categories import bump_category_version
+from services.models import (
+    RATING_SCALE,
+    Category,
+    LeaderboardEntry,
+    Rating,
+    RatingSummary,
+    Schedule,
+)
+
+SEED_DOMAIN = "seed.skill4cash.com"
+TRADES = (
+    "Electrician",
+    "FashionDesigner",
+    "WebDeveloper",
+    "Marketer",
+    "Promoter",
+    "Teacher",
+    "Plumber",
+    "Carpenter",
+    "Photographer",
+    "Caterer",
+)
+LOCATIONS = ("Lagos", "Ibadan", "Kano", "Abeokuta", "Benin", "Abuja", "Enugu")
+FIRST_NAMES = ("James", "John", "Ada", "Ngozi", "Tunde", "Aisha", "Emeka", "Funmi")
+LAST_NAMES = ("Peter", "Doe", "Okafor", "Adeyemi", "Bello", "Eze", "Balogun", "Musa")
+TITLES = ("Meeting", "Advert", "Picnic", "Social", "Outing")
+REVIEWS = (
+    "This is good :)",
+    "Great service, would book again",
+    "Came late but did a fine job",
+    "Not what we agreed on",
+    "Excellent work",
+)
+DURATIONS = tuple(timedelta(minutes=minutes) for minutes in (30, 60, 90, 120))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def zipf_weights(count, skew):
+    """Cumulative weights where the k-th item is 1/k**skew as popular as the first."""
+    return list(accumulate(1 / (rank**skew) for rank in range(1, count + 1)))
+
+
+def copy_rows(model, columns, rows):
+    """Load `rows` into the model's table with a single COPY ... FROM STDIN."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {model._meta.db_table} ({', '.join(columns)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large, reproducible data set of users, categories, ratings and "
+        "schedules for performance testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=100_000)
+        parser.add_argument("--providers", type=int, default=10_000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument(
+            "--reviews-per-provider",
+            type=float,
+            default=20,
+            help="Mean reviews per provider; --popularity-skew decides the spread.",
+        )
+        parser.add_argument(
+            "--schedules-per-provider",
+            type=float,
+            default=10,
+            help="Mean schedules per provider; --popularity-skew decides the spread.",
+        )
+        parser.add_argument(
+            "--popularity-skew",
+            type=float,
+            default=1.0,
+            help="Zipf exponent of provider and category popularity, 0 is uniform.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Reviews and schedules are spread over this many days.",
+        )
+        parser.add_argument(
+            "--start", type=date.fromisoformat, default=date(2026, 1, 1)
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--password", default="Password1!")
+
+    def handle(self, *args, **options):
+        # all or nothing, so a failed run leaves nothing to flush
+        with transaction.atomic():
+            self.seed(options)
+
+    def seed(self, options):
+        if User.objects.filter(email__endswith=f"@{SEED_DOMAIN}").exists():
+            raise CommandError(
+                "Seed data is already present, flush the database to seed again"
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.skew = options["popularity_skew"]
+        self.start = datetime.combine(options["start"], time(), tzinfo=dt_timezone.utc)
+        self.days = options["days"]
+        # hashing is deliberately slow, so every seeded user shares one hash
+        self.password = make_password(options["password"])
+        self.phone_numbers = iter(range(10**8))
+
+        categories = self.seed_categories(options["categories"])
+        customers = self.seed_users("customer", options["customers"])
+        providers = self.seed_users(
+            "service_provider", options["providers"], categories
+        )
+        popularity = zipf_weights(len(providers), self.skew)
+        ratings = self.seed_ratings(
+            providers,
+            customers,
+            popularity,
+            round(options["reviews_per_provider"] * len(providers)),
+        )
+        schedules = self.seed_schedules(
+            providers,
+            customers,
+            popularity,
+            round(options["schedules_per_provider"] * len(providers)),
+        )
+
+        # bulk inserts send no signals, so derived data is refreshed here
+        RatingSummary.objects.rebuild(batch_size=self.batch_size)
+        LeaderboardEntry.objects.refresh(
+            settings.LEADERBOARD_PRIOR_WEIGHT, batch_size=self.batch_size
+        )
+        transaction.on_commit(bump_category_version)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(categories)} categories, {len(customers)} customers, "
+                f"{len(providers)} service providers, {ratings} ratings and "
+                f"{schedules} schedules"
+            )
+        )
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def moment(self):
+        return self.start + timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    def seed_categories(self, count):
+        categories = [
+            Category(
+                id=self.uuid(), name=f"{TRADES[x % len(TRADES)]} {x // len(TRADES) + 1}"
+            )
+            for x in range(count)
+        ]
+        Category.objects.bulk_create(categories, batch_size=self.batch_size)
+        return [category.name for category in categories]
+
+    def seed_users(self, role, count, categories=None):
+        if categories:
+            category_weights = zipf_weights(len(categories), self.skew)
+
+        ids = []
+        for chunk in chunked(range(count), self.batch_size):
+            users = []
+            for x in chunk:
+                user = User(
+                    id=self.uuid(),
+                    email=f"{role}{x}@{SEED_DOMAIN}",
+                    password=self.password,
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    phone_number=f"+23480{next(self.phone_numbers):08d}",
+                    role=role,
+                    location=self.rng.choice(LOCATIONS),
+                    is_verified=self.rng.random() < 0.8,
+                    email_verification=self.rng.random() < 0.8,
+                    phone_verification=self.rng.random() < 0.6,
+                )
+                if categories:
+                    category = self.rng.choices(
+                        categories, cum_weights=category_weights
+                    )[0]
+                    user.service_category = category
+                    user.business_name = f"{user.first_name} {category} {x}"
+                    user.keywords = self.rng.sample(
+                        [trade.lower() for trade in TRADES], 2
+                    )
+                    user.is_verified_business = self.rng.random() < 0.3
+                users.append(user)
+            User.objects.bulk_create(users)
+            ids.extend(user.id for user in users)
+        return ids
+
+    def seed_ratings(self, providers, customers, popularity, total):
+        # each provider has a typical score that its ratings scatter around
+        quality = [self.rng.uniform(3, RATING_SCALE[-1]) for _ in providers]
+        columns = (
+            "id",
+            "service_provider_id",
+            "customer_id",
+            "rating",
+            "review",
+            "rated_at",
+        )
+
+        for chunk in chunked(range(total), self.batch_size):
+            picks = self.rng.choices(
+                range(len(providers)), cum_weights=popularity, k=len(chunk)
+            )
+            copy_rows(
+                Rating,
+                columns,
+                (
+                    (
+                        self.uuid(),
+                        providers[x],
+                        self.rng.choice(customers),
+                        min(
+                            max(
+                                round(self.rng.gauss(quality[x], 1.5)), RATING_SCALE[0]
+                            ),
+                            RATING_SCALE[-1],
+                        ),
+                        self.rng.choice(REVIEWS),
+                        self.moment(),
+                    )
+                    for x in picks
+                ),
+            )
+        return total
+
+    def seed_schedules(self, providers, customers, popularity, total):
+        columns = (
+            "id",
+            "title",
+            "service_provider_id",
+            "customer_id",
+            "date_and_time",
+            "duration",
+            "detail",
+            "updated_at",
+        )
+
+        for chunk in chunked(range(total), self.batch_size):
+            picks = self.rng.choices(
+                range(len(providers)), cum_weights=popularity, k=len(chunk)
+            )
+            rows = []
+            for x in picks:
+                # half-hour slots within working hours
+                day = self.start + timedelta(days=self.rng.randrange(self.days))
+                begins = day + timedelta(minutes=30 * self.rng.randrange(16, 36))
+                rows.append(
+                    (
+                        self.uuid(),
+                        self.rng.choice(TITLES),
+                        providers[x],
+                        self.rng.choice(customers),
+                        begins,
+                        self.rng.choice(DURATIONS),
+                        "Keep on update on all upcoming schedules",
+                        self.start,
+                    )
+                )
+            copy_rows(Schedule, columns, rows)
+        return total
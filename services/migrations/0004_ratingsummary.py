@@ -0,0 +1,30 @@
+# Generated by Django 3.2.9 on 2026-10-18 15:22
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import services.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_auto_20220802_1258'),
+        ('services', '0003_auto_20220802_1258'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('service_provider', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='authentication.user')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveBigIntegerField(default=0)),
+                ('histogram', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), default=services.models.empty_histogram, size=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Rating summaries',
+            },
+        ),
+    ]
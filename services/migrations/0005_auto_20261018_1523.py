@@ -0,0 +1,36 @@
+# Generated by Django 3.2.9 on 2026-10-18 15:23
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('services', '0004_ratingsummary'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='rating',
+            index=models.Index(fields=['service_provider', 'rated_at'], name='rating_sp_rated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='rating',
+            index=models.Index(fields=['rated_at', 'id'], name='rating_rated_at_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='schedule',
+            index=models.Index(fields=['service_provider', 'date_and_time'], name='schedule_sp_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='schedule',
+            index=models.Index(fields=['customer', 'date_and_time'], name='schedule_customer_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='schedule',
+            index=models.Index(fields=['date_and_time', 'id'], name='schedule_date_id_idx'),
+        ),
+    ]
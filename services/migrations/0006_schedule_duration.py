@@ -0,0 +1,20 @@
+# Generated by Django 3.2.9 on 2026-10-18 15:31
+
+import datetime
+from django.db import migrations, models
+import services.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_auto_20261018_1523'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='duration',
+            field=models.DurationField(default=datetime.timedelta(seconds=3600), validators=[services.models.validate_schedule_duration]),
+        ),
+    ]
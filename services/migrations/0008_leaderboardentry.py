@@ -0,0 +1,39 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_user_updated_at'),
+        ('services', '0007_schedule_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('service_provider', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard_entry', serialize=False, to='authentication.user')),
+                ('service_category', models.CharField(max_length=200)),
+                ('location', models.CharField(max_length=100)),
+                ('score', models.FloatField()),
+                ('mean', models.FloatField()),
+                ('review_count', models.PositiveIntegerField()),
+                ('category_rank', models.PositiveIntegerField()),
+                ('location_rank', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Leaderboard entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('service_category', 'category_rank'), name='leaderboard_category_rank_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('service_category', 'location', 'location_rank'), name='leaderboard_location_rank_uniq'),
+        ),
+    ]
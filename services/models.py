@@ -1,11 +1,30 @@
 import uuid
-from django.db import models
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
 
 from authentication.models import User
 
 
 # Create your models here.
 
+# the scores a review can carry, one histogram bucket each
+RATING_SCALE = range(10)
+
+# availability lookups rely on no booking being longer than this
+MAX_SCHEDULE_DURATION = timedelta(hours=24)
+
+
+def validate_schedule_duration(value):
+    if not timedelta(0) < value <= MAX_SCHEDULE_DURATION:
+        raise ValidationError(
+            f"duration must be positive and at most {MAX_SCHEDULE_DURATION}"
+        )
+
 
 class Category(models.Model):
     id = models.UUIDField(
@@ -34,6 +53,14 @@ class Rating(models.Model):
     )
     rated_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["service_provider", "rated_at"], name="rating_sp_rated_at_idx"
+            ),
+            models.Index(fields=["rated_at", "id"], name="rating_rated_at_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return str(self.rating)
 
@@ -50,7 +77,233 @@ class Schedule(models.Model):
         User, on_delete=models.CASCADE, related_name="customer_schedule"
     )
     date_and_time = models.DateTimeField()
+    duration = models.DurationField(
+        default=timedelta(hours=1), validators=[validate_schedule_duration]
+    )
     detail = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["service_provider", "date_and_time"],
+                name="schedule_sp_date_idx",
+            ),
+            models.Index(
+                fields=["customer", "date_and_time"], name="schedule_customer_date_idx"
+            ),
+            models.Index(fields=["date_and_time", "id"], name="schedule_date_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
+
+    @property
+    def ends_at(self):
+        return self.date_and_time + self.duration
+
+
+def empty_histogram():
+    return [0 for _ in RATING_SCALE]
+
+
+class RatingSummaryManager(models.Manager):
+    def record(self, rating):
+        """Fold a newly saved rating into its provider's summary."""
+        with transaction.atomic():
+            summary, _ = self.select_for_update().get_or_create(
+                service_provider_id=rating.service_provider_id
+            )
+            summary.count += 1
+            summary.total += rating.rating
+            summary.histogram[rating.rating] += 1
+            summary.save()
+        return summary
+
+    def discard(self, rating):
+        """Take a deleted rating back out of its provider's summary."""
+        with transaction.atomic():
+            summary = (
+                self.select_for_update()
+                .filter(service_provider_id=rating.service_provider_id)
+                .first()
+            )
+            if summary is None or summary.count == 0:
+                return summary
+            summary.count -= 1
+            summary.total -= rating.rating
+            summary.histogram[rating.rating] = max(
+                summary.histogram[rating.rating] - 1, 0
+            )
+            summary.save()
+        return summary
+
+    def rebuild(self, batch_size=1000):
+        """Recompute every summary from the Rating table in one grouped scan."""
+        buckets = {
+            f"bucket_{value}": Count("id", filter=Q(rating=value))
+            for value in RATING_SCALE
+        }
+        rows = (
+            Rating.objects.order_by()
+            .values("service_provider")
+            .annotate(count=Count("id"), total=Sum("rating"), **buckets)
+        )
+        summaries = (
+            RatingSummary(
+                service_provider_id=row["service_provider"],
+                count=row["count"],
+                total=row["total"],
+                histogram=[row[f"bucket_{value}"] for value in RATING_SCALE],
+            )
+            for row in rows.iterator(chunk_size=batch_size)
+        )
+        with transaction.atomic():
+            self.all().delete()
+            while batch := list(islice(summaries, batch_size)):
+                self.bulk_create(batch)
+
+
+class RatingSummary(models.Model):
+    service_provider = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rating_summary",
+    )
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveBigIntegerField(default=0)
+    histogram = ArrayField(
+        models.PositiveIntegerField(), size=len(RATING_SCALE), default=empty_histogram
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RatingSummaryManager()
+
+    class Meta:
+        verbose_name_plural = "Rating summaries"
+
+    def __str__(self) -> str:
+        return f"{self.service_provider}: {self.mean}"
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+
+def leaderboard_key(value):
+    """How categories and locations are matched: case and spacing ignored."""
+    return " ".join(value.split()).lower()
+
+
+class LeaderboardEntryManager(models.Manager):
+    def refresh(self, prior_weight, batch_size=1000):
+        """
+        Rank every rated provider within their category, and within their
+        category and location, from the rating summaries (one row per
+        provider, so the Rating table itself is never scanned).
+
+        Providers are ranked by Bayesian average: their ratings plus
+        `prior_weight` phantom ratings at the category's mean, so a couple
+        of perfect scores do not outrank hundreds of good ones.
+        """
+        rows = (
+            RatingSummary.objects.filter(
+                count__gt=0, service_provider__role="service_provider"
+            )
+            .exclude(service_provider__service_category__isnull=True)
+            .values_list(
+                "service_provider_id",
+                "service_provider__service_category",
+                "service_provider__location",
+                "count",
+                "total",
+            )
+        )
+        categories = defaultdict(list)
+        for service_provider_id, category, location, count, total in rows.iterator(
+            chunk_size=batch_size
+        ):
+            if category := leaderboard_key(category):
+                categories[category].append(
+                    (service_provider_id, leaderboard_key(location), count, total)
+                )
+
+        entries = []
+        for category, providers in categories.items():
+            reviews = sum(count for _, _, count, _ in providers)
+            prior = sum(total for _, _, _, total in providers) / reviews
+            ranked = sorted(
+                (
+                    LeaderboardEntry(
+                        service_provider_id=service_provider_id,
+                        service_category=category,
+                        location=location,
+                        score=(prior_weight * prior + total) / (prior_weight + count),
+                        mean=total / count,
+                        review_count=count,
+                    )
+                    for service_provider_id, location, count, total in providers
+                ),
+                # ties go to the provider with more reviews, then a stable order
+                key=lambda entry: (
+                    -entry.score,
+                    -entry.review_count,
+                    str(entry.service_provider_id),
+                ),
+            )
+            location_ranks = defaultdict(int)
+            for rank, entry in enumerate(ranked, start=1):
+                entry.category_rank = rank
+                location_ranks[entry.location] += 1
+                entry.location_rank = location_ranks[entry.location]
+            entries.extend(ranked)
+
+        # readers keep seeing the previous ranking until this commits
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(entries, batch_size=batch_size)
+        return len(entries)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A provider's place in the top-rated lists of their category, rebuilt
+    by the refresh_leaderboards command. Categories and locations are
+    stored as leaderboard_key() of the provider's own.
+    """
+
+    service_provider = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="leaderboard_entry",
+    )
+    service_category = models.CharField(max_length=200)
+    location = models.CharField(max_length=100)
+    score = models.FloatField()
+    mean = models.FloatField()
+    review_count = models.PositiveIntegerField()
+    category_rank = models.PositiveIntegerField()
+    location_rank = models.PositiveIntegerField()
+
+    objects = LeaderboardEntryManager()
+
+    class Meta:
+        verbose_name_plural = "Leaderboard entries"
+        # also the indexes every page is read from
+        constraints = [
+            models.UniqueConstraint(
+                fields=["service_category", "category_rank"],
+                name="leaderboard_category_rank_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["service_category", "location", "location_rank"],
+                name="leaderboard_location_rank_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.service_category} #{self.category_rank}: {self.service_provider}"
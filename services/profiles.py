@@ -0,0 +1,65 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from authentication.models import User
+from authentication.serializers import ServiceProviderSerializer
+
+from .models import Rating, Schedule
+from .serializers import RatingSerializer, ScheduleSerializer
+
+PROFILE_REVIEWS = 10
+PROFILE_SCHEDULES = 10
+# upcoming schedules drift into the past, so entries also expire on their own
+PROFILE_TTL = 60
+
+
+def profile_key(service_provider_id):
+    return f"sp-profile:{service_provider_id}"
+
+
+def forget_profile(*service_provider_ids):
+    cache.delete_many([profile_key(id) for id in service_provider_ids])
+
+
+def build_profile(service_provider_id):
+    """
+    Provider, rating summary, latest reviews and upcoming schedules in
+    three bounded queries. Django 3.2 cannot slice a Prefetch queryset, so
+    the two lists are their own LIMIT queries on the per-provider indexes.
+    """
+    try:
+        service_provider = User.objects.select_related("rating_summary").get(
+            pk=service_provider_id, role="service_provider"
+        )
+    except User.DoesNotExist:
+        return None
+
+    reviews = Rating.objects.filter(service_provider=service_provider).order_by(
+        "-rated_at"
+    )[:PROFILE_REVIEWS]
+    schedules = Schedule.objects.filter(
+        service_provider=service_provider, date_and_time__gte=timezone.now()
+    ).order_by("date_and_time")[:PROFILE_SCHEDULES]
+    return {
+        "service_provider": ServiceProviderSerializer(service_provider).data,
+        "latest_reviews": RatingSerializer(reviews, many=True).data,
+        "upcoming_schedules": ScheduleSerializer(schedules, many=True).data,
+    }
+
+
+def provider_profile(service_provider_id):
+    """(etag, profile) served from the cache, or None for an unknown provider."""
+    key = profile_key(service_provider_id)
+    if entry := cache.get(key):
+        return entry
+
+    profile = build_profile(service_provider_id)
+    if profile is None:
+        return None
+    digest = hashlib.sha1(repr(profile).encode()).hexdigest()
+    entry = (quote_etag(digest), profile)
+    cache.set(key, entry, timeout=PROFILE_TTL)
+    return entry
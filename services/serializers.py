@@ -1,26 +1,104 @@
+from datetime import timedelta
+
 from rest_framework import serializers
+
+from src.fieldsets import SparseFieldsetMixin
 from .models import (
+    RATING_SCALE,
     Rating,
+    RatingSummary,
     Category,
+    LeaderboardEntry,
     Schedule
 )
 
 
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    rating = serializers.IntegerField(
+        min_value=RATING_SCALE[0], max_value=RATING_SCALE[-1]
+    )
+
     class Meta:
         model = Rating
         fields = ("service_provider", "rating", "review", "customer")
         read_only_fields = ("id",)
 
+class RatingSummarySerializer(serializers.ModelSerializer):
+    sum = serializers.IntegerField(source="total", read_only=True)
+    mean = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = RatingSummary
+        fields = ("count", "sum", "mean", "histogram")
+        read_only_fields = ("count", "histogram")
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    business_name = serializers.CharField(source="service_provider.business_name")
+    location = serializers.CharField(source="service_provider.location")
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = (
+            "rank",
+            "service_provider",
+            "business_name",
+            "location",
+            "score",
+            "mean",
+            "review_count",
+        )
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Schedule
+        fields = (
+            "title",
+            "customer",
+            "date_and_time",
+            "duration",
+            "detail",
+            "service_provider",
+        )
+        read_only_fields = ('id',)
+
+class BulkScheduleItemSerializer(serializers.ModelSerializer):
+    # plain ids: the bulk view resolves every referenced user in one query
+    customer = serializers.UUIDField()
+    service_provider = serializers.UUIDField()
+
     class Meta:
         model = Schedule
-        fields = ("title", "customer", "date_and_time", "detail", "service_provider")
-        read_only_fields = ('id',)
\ No newline at end of file
+        fields = (
+            "title",
+            "customer",
+            "date_and_time",
+            "duration",
+            "detail",
+            "service_provider",
+        )
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    service_provider = serializers.ListField(
+        child=serializers.UUIDField(), min_length=1, max_length=50
+    )
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    slot_minutes = serializers.IntegerField(min_value=1, max_value=24 * 60, default=30)
+
+    def validate(self, attrs):
+        if attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError({"end": "end must be after start"})
+        if attrs["end"] - attrs["start"] > timedelta(days=31):
+            raise serializers.ValidationError(
+                {"end": "window can span at most 31 days"}
+            )
+        return attrs
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import User
+from .categories import bump_category_version
+from .models import Category, Rating, RatingSummary, Schedule
+from .profiles import forget_profile
+
+
+@receiver(post_delete, sender=Rating)
+def discard_rating_from_summary(sender, instance, **kwargs):
+    RatingSummary.objects.discard(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_list(sender, instance, **kwargs):
+    # after commit, so a concurrent reader cannot cache the old rows
+    # under the new version
+    transaction.on_commit(bump_category_version)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def invalidate_provider_profile(sender, instance, **kwargs):
+    transaction.on_commit(lambda: forget_profile(instance.service_provider_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_own_profile(sender, instance, **kwargs):
+    if instance.role == "service_provider":
+        transaction.on_commit(lambda: forget_profile(instance.pk))
@@ -1,3 +1,861 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import User
+from authentication.serializers import ServiceProviderSerializer
+from src.metrics import QueryRecorder, registry
+from .availability import free_slots
+from .categories import VERSION_KEY
+from .management.commands.loadtest import percentile
+from .models import Category, LeaderboardEntry, Rating, RatingSummary, Schedule
+
+
+def create_user(index, role):
+    return User.objects.create_user(
+        email=f"user{index}@skill4cash.com",
+        password="Password1!",
+        first_name="John",
+        last_name="Doe",
+        phone_number=f"+23480300000{index:02d}",
+        role=role,
+        location="Lagos",
+    )
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.client.force_authenticate(self.customer)
+
+        for x in range(5):
+            Rating.objects.create(
+                service_provider=self.service_provider,
+                customer=self.customer,
+                rating=x,
+                review="This is good :)",
+            )
+            Schedule.objects.create(
+                title=f"Meeting {x}",
+                service_provider=self.service_provider,
+                customer=self.customer,
+                date_and_time=timezone.now(),
+                detail="Keep on update on all upcoming schedules",
+            )
+        # identical sort keys must still page deterministically on id
+        Rating.objects.update(rated_at=timezone.now())
+
+    def collect(self, url):
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            results.extend(response.data["results"])
+            url = response.data["next"]
+        return results
+
+    def test_reviews_are_paged_without_gaps_or_duplicates(self):
+        """
+        Walking the cursor chain should return every rating exactly once.
+        """
+        results = self.collect("/api/v1/review/?page_size=2")
+
+        self.assertEqual(sorted(r["rating"] for r in results), [0, 1, 2, 3, 4])
+
+    def test_schedules_are_paged_without_gaps_or_duplicates(self):
+        results = self.collect("/api/v1/schedule/?page_size=2")
+
+        self.assertEqual(
+            sorted(s["title"] for s in results),
+            [f"Meeting {x}" for x in range(5)],
+        )
+
+    def test_page_size_is_bounded(self):
+        """
+        page_size above the paginator's maximum should be clamped.
+        """
+        response = self.client.get("/api/v1/review/?page_size=100000")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get("/api/v1/review/?cursor=not-a-cursor")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RatingSummaryTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.client.force_authenticate(self.customer)
+
+    def post_review(self, rating):
+        return self.client.post(
+            "/api/v1/review/",
+            {
+                "customer": str(self.customer.id),
+                "service_provider": str(self.service_provider.id),
+                "rating": rating,
+                "review": "This is good :)",
+            },
+            format="json",
+        )
+
+    def test_posting_reviews_updates_summary(self):
+        """
+        Each accepted review should be folded into the provider's
+        count, sum and histogram.
+        """
+        for rating in (9, 7, 7):
+            response = self.post_review(rating)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        summary = RatingSummary.objects.get(service_provider=self.service_provider)
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(summary.total, 23)
+        self.assertAlmostEqual(summary.mean, 23 / 3)
+        self.assertEqual(summary.histogram[7], 2)
+        self.assertEqual(summary.histogram[9], 1)
+
+    def test_out_of_scale_rating_is_rejected(self):
+        response = self.post_review(10)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RatingSummary.objects.exists())
+
+    def test_deleted_review_is_discarded(self):
+        self.post_review(4)
+        self.post_review(8)
+
+        Rating.objects.get(rating=8).delete()
+
+        summary = RatingSummary.objects.get(service_provider=self.service_provider)
+        self.assertEqual((summary.count, summary.total), (1, 4))
+        self.assertEqual(summary.histogram[8], 0)
+
+    def test_rebuild_matches_incremental_summary(self):
+        for rating in (1, 2, 2, 5):
+            self.post_review(rating)
+        expected = RatingSummary.objects.get(service_provider=self.service_provider)
+
+        RatingSummary.objects.rebuild()
+
+        rebuilt = RatingSummary.objects.get(service_provider=self.service_provider)
+        self.assertEqual(
+            (rebuilt.count, rebuilt.total, rebuilt.histogram),
+            (expected.count, expected.total, expected.histogram),
+        )
+
+    def test_service_provider_serializer_exposes_summary(self):
+        response = self.client.get(f"/api/v1/sp/{self.service_provider.id}/")
+        self.assertEqual(response.data["rating_summary"]["count"], 0)
+        self.assertIsNone(response.data["rating_summary"]["mean"])
+
+        self.post_review(6)
+
+        response = self.client.get(f"/api/v1/sp/{self.service_provider.id}/")
+        self.assertEqual(response.data["rating_summary"]["sum"], 6)
+        self.assertEqual(response.data["rating_summary"]["mean"], 6.0)
+
+    def test_provider_lists_load_summaries_in_one_query(self):
+        self.post_review(6)
+        create_user(3, "service_provider")
+
+        # the providers, then every summary at once
+        with self.assertNumQueries(2):
+            data = ServiceProviderSerializer(
+                User.objects.filter(role="service_provider").order_by("email"),
+                many=True,
+            ).data
+
+        self.assertEqual([row["rating_summary"]["count"] for row in data], [1, 0])
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        """
+        Every hot lookup should be answerable from an index; a missing
+        index makes check_query_plans exit with an error. The test database
+        is too small for the planner to prefer any index, so only their
+        presence is checked here.
+        """
+        out = StringIO()
+        call_command("check_query_plans", force_index=True, stdout=out)
+
+        self.assertIn("All hot queries use an index", out.getvalue())
+
+
+class BulkCreateScheduleTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.client.force_authenticate(self.customer)
+
+    def item(self, x, **overrides):
+        return {
+            "title": f"Meeting {x}",
+            "customer": str(self.customer.id),
+            "service_provider": str(self.service_provider.id),
+            "date_and_time": timezone.now().isoformat(),
+            "detail": "Keep on update on all upcoming schedules",
+            **overrides,
+        }
+
+    def test_batch_is_inserted_with_constant_queries(self):
+        """
+        Validation should resolve users with one query per role and
+        insert every schedule in a single statement.
+        """
+        items = [self.item(x) for x in range(50)]
+
+        # two role lookups, then one INSERT inside a savepoint
+        with self.assertNumQueries(5):
+            response = self.client.post("/api/v1/schedule/bulk/", items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 50)
+        self.assertEqual(Schedule.objects.count(), 50)
+
+    def test_partial_success_reports_item_errors(self):
+        items = [
+            self.item(0),
+            self.item(1, customer=str(self.service_provider.id)),
+            self.item(2, date_and_time="tomorrow"),
+        ]
+
+        response = self.client.post("/api/v1/schedule/bulk/", items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([c["index"] for c in response.data["created"]], [0])
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2])
+        self.assertIn("customer", response.data["errors"][0]["errors"])
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_oversized_batch_is_rejected(self):
+        items = [self.item(x) for x in range(501)]
+
+        response = self.client.post("/api/v1/schedule/bulk/", items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Schedule.objects.exists())
+
+
+class AvailabilityTests(APITestCase):
+    start = datetime(2026, 11, 2, 8, tzinfo=dt_timezone.utc)
+    end = datetime(2026, 11, 2, 18, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.client.force_authenticate(self.customer)
+
+    def book(self, hour, minutes):
+        return Schedule.objects.create(
+            title="Meeting",
+            service_provider=self.service_provider,
+            customer=self.customer,
+            date_and_time=self.start.replace(hour=0) + timedelta(hours=hour),
+            duration=timedelta(minutes=minutes),
+            detail="Keep on update on all upcoming schedules",
+        )
+
+    def get_availability(self, **params):
+        return self.client.get(
+            "/api/v1/availability/",
+            {
+                "service_provider": [str(self.service_provider.id)],
+                "start": self.start.isoformat(),
+                "end": self.end.isoformat(),
+                **params,
+            },
+        )
+
+    def test_overlapping_bookings_are_merged(self):
+        at = self.start.replace
+        bookings = [
+            (at(hour=9), at(hour=11)),
+            (at(hour=10), at(hour=10, minute=30)),
+            (at(hour=10, minute=45), at(hour=12)),
+            (at(hour=12, minute=10), at(hour=13)),
+        ]
+
+        slots = list(free_slots(bookings, self.start, self.end, timedelta(minutes=15)))
+
+        self.assertEqual(slots, [(at(hour=8), at(hour=9)), (at(hour=13), self.end)])
+
+    def test_booking_started_before_window_is_honoured(self):
+        """
+        A booking that began before the window but runs into it
+        should still block the start of the window.
+        """
+        self.book(hour=7, minutes=120)
+        self.book(hour=12, minutes=60)
+
+        response = self.get_availability()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        free = response.data["availability"][0]["free"]
+        self.assertEqual(
+            [(slot["start"].hour, slot["end"].hour) for slot in free],
+            [(9, 12), (13, 18)],
+        )
+
+    def test_query_count_does_not_grow_with_history(self):
+        for day in range(1, 30):
+            self.book(hour=-24 * day + 10, minutes=60)
+
+        # provider lookup, then one range scan over the window
+        with self.assertNumQueries(2):
+            response = self.get_availability()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unknown_service_provider_is_rejected(self):
+        response = self.get_availability(service_provider=[str(self.customer.id)])
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data["ids"], [str(self.customer.id)])
+
+    def test_window_is_bounded(self):
+        response = self.get_availability(
+            end=(self.start + timedelta(days=32)).isoformat()
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_schedule_duration_is_validated(self):
+        response = self.client.post(
+            "/api/v1/schedule/bulk/",
+            [
+                {
+                    "title": "Meeting",
+                    "customer": str(self.customer.id),
+                    "service_provider": str(self.service_provider.id),
+                    "date_and_time": self.start.isoformat(),
+                    "duration": "25:00:00",
+                    "detail": "Keep on update on all upcoming schedules",
+                }
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("duration", response.data["errors"][0]["errors"])
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.schedule = Schedule.objects.create(
+            title="Meeting",
+            service_provider=self.service_provider,
+            customer=self.customer,
+            date_and_time=timezone.now(),
+            detail="Keep on update on all upcoming schedules",
+        )
+
+    def test_view_latency_and_queries_are_exported(self):
+        self.client.force_authenticate(self.service_provider)
+        response = self.client.get(
+            f"/api/v1/schedule/service-provider/{self.schedule.id}/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        metrics = self.client.get("/metrics").content.decode()
+
+        labels = 'view="services.views.ReadUpdateDeleteSchedule",method="GET"'
+        self.assertIn(
+            f'http_request_duration_seconds_count{{{labels},status="200"}} 1', metrics
+        )
+        self.assertIn(f"http_request_db_queries_count{{{labels}}} 1", metrics)
+        self.assertIn(f"http_request_db_seconds_total{{{labels}}}", metrics)
+
+    def test_metrics_are_internal(self):
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.7")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_scrapes_add_up_every_worker(self):
+        labels = 'view="services.views.ReadUpdateDeleteSchedule",method="GET"'
+        registry.record(
+            "services.views.ReadUpdateDeleteSchedule", "GET", 200, 0.01, 1, 0.001, False
+        )
+        # another worker's numbers, as it would have published them
+        snapshot = registry.snapshot()
+        cache.set("metrics:worker:other", snapshot)
+        cache.set("metrics:workers", [registry.worker, "other"])
+
+        metrics = self.client.get("/metrics").content.decode()
+
+        self.assertIn(
+            f'http_request_duration_seconds_count{{{labels},status="200"}} 2', metrics
+        )
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_metrics_allow_the_client_behind_the_router(self):
+        response = self.client.get(
+            "/metrics", REMOTE_ADDR="10.1.2.3", HTTP_X_FORWARDED_FOR="127.0.0.1"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            "/metrics", REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.7"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_repeated_queries_are_flagged(self):
+        """
+        The same statement issued once per row should be reported
+        however its parameters differ.
+        """
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for user in (self.customer, self.service_provider) * 3:
+                User.objects.get(id=user.id)
+            Schedule.objects.count()
+
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual(len(recorder.repeated(threshold=5)), 1)
+        self.assertEqual(recorder.repeated(threshold=7), [])
+
+
+class CategoryListCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        customer = create_user(1, "customer")
+        token = AccessToken.for_user(customer)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        Category.objects.create(name="Plumbing")
+
+    def test_unchanged_list_is_not_modified_without_queries(self):
+        """
+        A client holding the current ETag should get a 304 that
+        neither authentication nor the view answers from the database.
+        """
+        response = self.client.get("/api/v1/category/")
+        self.assertEqual(response.data, {"categories": ["Plumbing"]})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                "/api/v1/category/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_category_write_changes_the_etag(self):
+        etag = self.client.get("/api/v1/category/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/v1/category/", {"name": "Carpentry"})
+        response = self.client.get("/api/v1/category/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"categories": ["Carpentry", "Plumbing"]})
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_evicted_version_does_not_bring_back_a_stale_list(self):
+        self.client.get("/api/v1/category/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/v1/category/", {"name": "Carpentry"})
+        cache.delete(VERSION_KEY)
+
+        response = self.client.get("/api/v1/category/")
+
+        self.assertEqual(response.data, {"categories": ["Carpentry", "Plumbing"]})
+
+
+class ServiceProviderListValidatorTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.client.force_authenticate(self.service_provider)
+        for x in range(3):
+            Rating.objects.create(
+                service_provider=self.service_provider,
+                customer=self.customer,
+                rating=x,
+                review="This is good :)",
+            )
+            self.schedule = Schedule.objects.create(
+                title=f"Meeting {x}",
+                service_provider=self.service_provider,
+                customer=self.customer,
+                date_and_time=timezone.now(),
+                detail="Keep on update on all upcoming schedules",
+            )
+
+    def test_unchanged_reviews_are_not_modified(self):
+        response = self.client.get("/api/v1/reviews/")
+        self.assertEqual(len(response.data), 3)
+
+        # only the validator aggregate, nothing is serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/v1/reviews/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_deleted_review_changes_etag(self):
+        etag = self.client.get("/api/v1/reviews/")["ETag"]
+
+        Rating.objects.filter(rating=0).delete()
+        response = self.client.get("/api/v1/reviews/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_lists_are_not_validated_by_date(self):
+        """
+        max(rated_at) misses same-second additions and older deletions, so
+        the lists must not answer If-Modified-Since with a 304.
+        """
+        response = self.client.get("/api/v1/reviews/")
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        Rating.objects.filter(rating=0).delete()
+        response = self.client.get(
+            "/api/v1/reviews/",
+            HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            self.client.get("/api/v1/schedules/").has_header("Last-Modified")
+        )
+
+    def test_edited_schedule_changes_etag(self):
+        response = self.client.get("/api/v1/schedules/")
+        self.assertEqual(len(response.data), 3)
+        etag = response["ETag"]
+
+        self.schedule.title = "Moved meeting"
+        self.schedule.save()
+        response = self.client.get("/api/v1/schedules/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Moved meeting", [s["title"] for s in response.data])
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/v1/schedules/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class SeedDataTests(TestCase):
+    options = dict(
+        customers=20,
+        providers=5,
+        categories=3,
+        reviews_per_provider=4,
+        schedules_per_provider=2,
+        batch_size=7,
+    )
+
+    def seed(self, **options):
+        call_command("seed_data", **{**self.options, **options}, stdout=StringIO())
+        return list(
+            Rating.objects.order_by("id").values_list(
+                "id", "service_provider", "customer", "rating", "rated_at"
+            )
+        )
+
+    def test_volumes_and_derived_data(self):
+        self.seed()
+
+        self.assertEqual(User.objects.filter(role="customer").count(), 20)
+        self.assertEqual(User.objects.filter(role="service_provider").count(), 5)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Rating.objects.count(), 20)
+        self.assertEqual(Schedule.objects.count(), 10)
+        self.assertEqual(sum(RatingSummary.objects.values_list("count", flat=True)), 20)
+        self.assertTrue(LeaderboardEntry.objects.exists())
+
+    def test_same_seed_gives_same_data(self):
+        """
+        Reseeding from an empty database with the same seed should
+        reproduce every row.
+        """
+        first = self.seed()
+        User.objects.all().delete()
+        Category.objects.all().delete()
+
+        self.assertEqual(self.seed(), first)
+        User.objects.all().delete()
+        Category.objects.all().delete()
+        self.assertNotEqual(self.seed(seed=7), first)
+
+    def test_popularity_is_skewed(self):
+        self.seed(reviews_per_provider=100, popularity_skew=2)
+
+        counts = sorted(RatingSummary.objects.values_list("count", flat=True))
+        self.assertGreater(counts[-1], sum(counts) / 2)
+
+
+class BenchmarkTests(TestCase):
+    def test_results_are_saved_as_baseline(self):
+        call_command(
+            "seed_data", customers=10, providers=10, categories=2, stdout=StringIO()
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / "baseline.json"
+            call_command(
+                "benchmark",
+                rows=[5],
+                repeat=1,
+                baseline=baseline,
+                save=True,
+                stdout=StringIO(),
+            )
+
+            results = json.loads(baseline.read_text())
+        self.assertIn("RatingSerializer x5", results)
+        self.assertIn("create_token", results)
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+
+
+class LoadTestReportTests(TestCase):
+    def test_percentiles_use_nearest_rank(self):
+        samples = [x / 100 for x in range(1, 101)]
+
+        self.assertEqual(percentile(samples, 50), 0.5)
+        self.assertEqual(percentile(samples, 95), 0.95)
+        self.assertEqual(percentile(samples, 99), 0.99)
+        self.assertEqual(percentile([0.2], 99), 0.2)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.client.force_authenticate(self.customer)
+        for x in range(3):
+            Rating.objects.create(
+                service_provider=self.service_provider,
+                customer=self.customer,
+                rating=x,
+                review="This is good :)",
+            )
+
+    def test_fields_trim_output_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/v1/review/", {"fields": "rating", "page_size": 2}
+            )
+
+        self.assertEqual(response.data["results"], [{"rating": 0}, {"rating": 1}])
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertIn('"services_rating"."rating"', sql)
+        self.assertNotIn('"services_rating"."review"', sql)
+
+    def test_keyset_columns_are_kept_for_the_cursor(self):
+        response = self.client.get(
+            "/api/v1/review/", {"fields": "rating", "page_size": 2}
+        )
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(response.data["results"], [{"rating": 2}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/api/v1/schedule/", {"fields": "title,password"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("password", str(response.data["fields"]))
+
+
+class ProviderProfileTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = create_user(1, "customer")
+        self.service_provider = create_user(2, "service_provider")
+        self.url = f"/api/v1/sp/{self.service_provider.id}/profile/"
+        for x in range(15):
+            rating = Rating.objects.create(
+                service_provider=self.service_provider,
+                customer=self.customer,
+                rating=x % 10,
+                review="This is good :)",
+            )
+            RatingSummary.objects.record(rating)
+            Schedule.objects.create(
+                title=f"Meeting {x}",
+                service_provider=self.service_provider,
+                customer=self.customer,
+                date_and_time=timezone.now() + timedelta(days=x - 3, hours=1),
+                detail="Keep on update on all upcoming schedules",
+            )
+
+    def test_profile_is_built_in_fixed_queries_then_cached(self):
+        self.client.force_authenticate(self.service_provider)
+
+        # provider with summary, latest reviews, upcoming schedules
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.assertEqual(
+            response.data["service_provider"]["rating_summary"]["count"], 15
+        )
+        self.assertEqual(len(response.data["latest_reviews"]), 10)
+        upcoming = response.data["upcoming_schedules"]
+        self.assertEqual(len(upcoming), 10)
+        self.assertEqual(upcoming[0]["title"], "Meeting 3")
+
+    def test_writes_invalidate_the_cached_profile(self):
+        self.client.force_authenticate(self.service_provider)
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/v1/schedule/bulk/",
+                [
+                    {
+                        "title": "Urgent",
+                        "customer": str(self.customer.id),
+                        "service_provider": str(self.service_provider.id),
+                        "date_and_time": (
+                            timezone.now() + timedelta(minutes=30)
+                        ).isoformat(),
+                        "detail": "Keep on update on all upcoming schedules",
+                    }
+                ],
+                format="json",
+            )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["upcoming_schedules"][0]["title"], "Urgent")
+
+    def test_populated_business_names_invalidate_the_cached_profile(self):
+        self.client.force_authenticate(self.service_provider)
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get("/api/v1/populate-sp/")
+        response = self.client.get(self.url)
+
+        self.assertTrue(
+            response.data["service_provider"]["business_name"].endswith(
+                str(self.service_provider.id)
+            )
+        )
+
+    def test_other_users_only_see_busy_slots(self):
+        self.client.force_authenticate(self.customer)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            set(response.data["upcoming_schedules"][0]), {"date_and_time", "duration"}
+        )
+
+    def test_unknown_provider(self):
+        self.client.force_authenticate(self.customer)
+
+        response = self.client.get(f"/api/v1/sp/{self.customer.id}/profile/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class LeaderboardTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(1, "customer")
+        self.providers = []
+        # (category, location, ratings)
+        for index, (category, location, ratings) in enumerate(
+            [
+                ("Electrician", "Lagos", [9, 9]),
+                ("electrician ", "Lagos", [8] * 30),
+                ("Electrician", "Abuja", [7] * 10),
+                ("Electrician", "Lagos", [2] * 5),
+                ("Plumber", "Lagos", [9]),
+                (None, "Lagos", [9]),
+            ],
+            start=2,
+        ):
+            provider = create_user(index, "service_provider")
+            provider.service_category = category
+            provider.location = location
+            provider.save()
+            for rating in ratings:
+                RatingSummary.objects.record(
+                    Rating.objects.create(
+                        service_provider=provider,
+                        customer=self.customer,
+                        rating=rating,
+                        review="Good",
+                    )
+                )
+            self.providers.append(provider)
+
+        call_command("refresh_leaderboards", once=True, stdout=StringIO())
+
+    def ranking(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [entry["service_provider"] for entry in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_few_perfect_reviews_do_not_top_many_good_ones(self):
+        ids = self.ranking("/api/v1/leaderboard/electrician/?page_size=1")
+
+        self.assertEqual(ids, [self.providers[index].id for index in (1, 0, 2, 3)])
+
+    def test_score_is_bayesian_average(self):
+        entry = LeaderboardEntry.objects.get(service_provider=self.providers[0])
+        # category mean: (18 + 240 + 70 + 10) / 47 reviews
+        prior = 338 / 47
+
+        self.assertAlmostEqual(entry.score, (10 * prior + 18) / (10 + 2))
+        self.assertEqual(entry.mean, 9)
+        self.assertEqual(entry.review_count, 2)
+
+    def test_location_has_its_own_ranks(self):
+        response = self.client.get("/api/v1/leaderboard/Electrician/?location=LAGOS")
+
+        self.assertEqual(
+            [
+                (entry["rank"], entry["service_provider"])
+                for entry in response.data["results"]
+            ],
+            [
+                (rank, self.providers[index].id)
+                for rank, index in ((1, 1), (2, 0), (3, 3))
+            ],
+        )
+
+    def test_providers_without_category_are_left_out(self):
+        self.assertFalse(
+            LeaderboardEntry.objects.filter(service_provider=self.providers[5]).exists()
+        )
+        self.assertEqual(
+            self.ranking("/api/v1/leaderboard/plumber/"), [self.providers[4].id]
+        )
+
+    def test_page_reads_do_not_grow_with_the_board(self):
+        with self.assertNumQueries(1):
+            self.client.get("/api/v1/leaderboard/electrician/?page_size=2")
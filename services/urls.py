@@ -3,6 +3,10 @@ from django.urls import path
 from .views import (
     CreateReadReview,
     CreateReadSchedule,
+    BulkCreateSchedule,
+    ServiceProviderAvailability,
+    ServiceProviderProfile,
+    CategoryLeaderboard,
     ReadSPReviews,
     CreateReadCategory,
     ReadSPSchedules,
@@ -17,7 +21,11 @@ urlpatterns = [
     path("reviews/", ReadSPReviews.as_view(), name='sp_review-list'),
     path("category/", CreateReadCategory.as_view(), name="categories-list"),
     path("schedule/", CreateReadSchedule.as_view(), name='schedule-list'),
+    path("schedule/bulk/", BulkCreateSchedule.as_view(), name='schedule-bulk'),
     path("schedules/", ReadSPSchedules.as_view(), name='sp_schedule-list'),
+    path("availability/", ServiceProviderAvailability.as_view(), name='sp-availability'),
+    path("sp/<uuid:id>/profile/", ServiceProviderProfile.as_view(), name='sp-profile'),
+    path("leaderboard/<str:category>/", CategoryLeaderboard.as_view(), name='category-leaderboard'),
     path("schedule/service-provider/<str:id>/",
          ReadUpdateDeleteSchedule.as_view(), name='sch_sp-detail'),
     path('populate-sch-cat/', PopulateData.as_view()),
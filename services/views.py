@@ -1,31 +1,62 @@
-from .serializers import RatingSerializer, CategorySerializer, ScheduleSerializer
+from .availability import availability
+from .categories import category_list
+from .profiles import forget_profile, provider_profile
+from .serializers import (
+    AvailabilityQuerySerializer,
+    BulkScheduleItemSerializer,
+    RatingSerializer,
+    CategorySerializer,
+    LeaderboardEntrySerializer,
+    ScheduleSerializer,
+)
 
-from .models import Rating, Category, Schedule
+from .models import (
+    Rating,
+    RatingSummary,
+    Category,
+    LeaderboardEntry,
+    Schedule,
+    leaderboard_key,
+)
 
 from authentication.models import (
     User,
 )
 from random import choice
+from django.db import transaction
+from django.db.models import Count, F, Max
 from django.utils import timezone
+from datetime import timedelta
 
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from src.conditional import conditional_response, make_etag
+from src.fieldsets import project, sparse_fieldset
+from src.pagination import KeysetPagination
 from src.permissions import IsOwnerOrReadOnly
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.exceptions import ObjectDoesNotExist
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
 
 class CreateReadReview(APIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = RatingSerializer
-    ratings = Rating.objects.all()
 
     def get(self, request):
-        ratings_seriailizers = RatingSerializer(self.ratings, many=True)
+        fields = sparse_fieldset(request, RatingSerializer)
+        paginator = KeysetPagination(ordering=("rated_at", "id"))
+        ratings = paginator.paginate_queryset(
+            project(Rating.objects.all(), RatingSerializer, fields, paginator.ordering),
+            request,
+            view=self,
+        )
+        ratings_seriailizers = RatingSerializer(
+            ratings, many=True, context={"fields": fields}
+        )
 
-        return Response(ratings_seriailizers.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(ratings_seriailizers.data)
 
     @swagger_auto_schema(request_body=serializer_class)
     def post(self, request):
@@ -39,7 +70,9 @@ class CreateReadReview(APIView):
 
         serializer = RatingSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                rating = serializer.save()
+                RatingSummary.objects.record(rating)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -47,31 +80,43 @@ class CreateReadReview(APIView):
 
 class ReadSPReviews(APIView):
     permission_classes = (IsAuthenticated,)
-    queryset = Rating.objects.all()
 
     def get(self, request):
-        try:
-            sp_review = Rating.objects.filter(service_provider__user=request.user)
-            if sp_review.exists():
-                return Response(sp_review, status=status.HTTP_200_OK)
-            else:
-                return Response({"ratings": []}, status=status.HTTP_204_NO_CONTENT)
-        except ObjectDoesNotExist:
-            return Response(
-                {"message": "Service Provider does not exist"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        fields = sparse_fieldset(request, RatingSerializer)
+        sp_reviews = Rating.objects.filter(service_provider=request.user)
+        # reviews are only ever added or removed, so count and newest
+        # timestamp change whenever the list does. No Last-Modified: a
+        # review added in the same second, or any deletion but the newest,
+        # leaves it unchanged, so If-Modified-Since would serve stale lists
+        validators = sp_reviews.aggregate(count=Count("id"), latest=Max("rated_at"))
+        if not validators["count"]:
+            return Response({"ratings": []}, status=status.HTTP_204_NO_CONTENT)
+
+        return conditional_response(
+            request,
+            lambda: Response(
+                RatingSerializer(
+                    project(sp_reviews, RatingSerializer, fields).order_by("rated_at"),
+                    many=True,
+                    context={"fields": fields},
+                ).data,
+                status=status.HTTP_200_OK,
+            ),
+            etag=make_etag(validators["count"], validators["latest"], fields),
+        )
 
 
 class CreateReadCategory(APIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = CategorySerializer
-    category = Category.objects.all()
 
     def get(self, request):
-        category_serializer = CategorySerializer(self.category, many=True)
-        category_list = [category["name"] for category in category_serializer.data]
-        return Response({"categories": category_list}, status=status.HTTP_200_OK)
+        etag, names = category_list()
+        return conditional_response(
+            request,
+            lambda: Response({"categories": names}, status=status.HTTP_200_OK),
+            etag=etag,
+        )
 
     @swagger_auto_schema(request_body=serializer_class)
     def post(self, request):
@@ -94,11 +139,19 @@ class CreateReadCategory(APIView):
 class CreateReadSchedule(APIView):
     serializer_class = ScheduleSerializer
     permission_classes = (IsAuthenticated,)
-    schedules = Schedule.objects.all()
 
     def get(self, request):
-        schedules = ScheduleSerializer(self.schedules, many=True)
-        return Response(schedules.data, status=status.HTTP_200_OK)
+        fields = sparse_fieldset(request, ScheduleSerializer)
+        paginator = KeysetPagination(ordering=("date_and_time", "id"))
+        page = paginator.paginate_queryset(
+            project(
+                Schedule.objects.all(), ScheduleSerializer, fields, paginator.ordering
+            ),
+            request,
+            view=self,
+        )
+        schedules = ScheduleSerializer(page, many=True, context={"fields": fields})
+        return paginator.get_paginated_response(schedules.data)
 
     @swagger_auto_schema(request_body=serializer_class)
     def post(self, request):
@@ -120,21 +173,231 @@ class CreateReadSchedule(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkCreateSchedule(APIView):
+    serializer_class = BulkScheduleItemSerializer
+    permission_classes = (IsAuthenticated,)
+    max_batch_size = 500
+
+    @swagger_auto_schema(request_body=BulkScheduleItemSerializer(many=True))
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Expected a non-empty list of schedules"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.max_batch_size:
+            return Response(
+                {"error": f"At most {self.max_batch_size} schedules per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        errors, valid = {}, []
+        for index, item in enumerate(items):
+            serializer = BulkScheduleItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+
+        customers = set(
+            User.objects.filter(
+                role="customer", id__in={data["customer"] for _, data in valid}
+            ).values_list("id", flat=True)
+        )
+        service_providers = set(
+            User.objects.filter(
+                role="service_provider",
+                id__in={data["service_provider"] for _, data in valid},
+            ).values_list("id", flat=True)
+        )
+
+        schedules, indexes = [], []
+        for index, data in valid:
+            item_errors = {}
+            if data["customer"] not in customers:
+                item_errors["customer"] = ["Customer does not exist"]
+            if data["service_provider"] not in service_providers:
+                item_errors["service_provider"] = ["Service provider does not exist"]
+            if item_errors:
+                errors[index] = item_errors
+                continue
+            schedules.append(
+                Schedule(
+                    customer_id=data.pop("customer"),
+                    service_provider_id=data.pop("service_provider"),
+                    **data,
+                )
+            )
+            indexes.append(index)
+
+        if schedules:
+            with transaction.atomic():
+                Schedule.objects.bulk_create(schedules)
+                # bulk_create sends no post_save, so profiles are dropped here
+                providers = {schedule.service_provider_id for schedule in schedules}
+                transaction.on_commit(lambda: forget_profile(*providers))
+
+        if not schedules:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(
+            {
+                "created": [
+                    {"index": index, "id": schedule.id}
+                    for index, schedule in zip(indexes, schedules)
+                ],
+                "errors": [
+                    {"index": index, "errors": errors[index]}
+                    for index in sorted(errors)
+                ],
+            },
+            status=response_status,
+        )
+
+
+class ServiceProviderAvailability(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(query_serializer=AvailabilityQuerySerializer)
+    def get(self, request):
+        query = AvailabilityQuerySerializer(
+            data={
+                **request.query_params.dict(),
+                "service_provider": request.query_params.getlist("service_provider"),
+            }
+        )
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+
+        requested = set(params["service_provider"])
+        service_providers = set(
+            User.objects.filter(role="service_provider", id__in=requested).values_list(
+                "id", flat=True
+            )
+        )
+        if unknown := requested - service_providers:
+            return Response(
+                {
+                    "error": "Service provider does not exist",
+                    "ids": sorted(map(str, unknown)),
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        free = availability(
+            params["service_provider"],
+            params["start"],
+            params["end"],
+            timedelta(minutes=params["slot_minutes"]),
+        )
+        return Response(
+            {
+                "start": params["start"],
+                "end": params["end"],
+                "availability": [
+                    {
+                        "service_provider": service_provider,
+                        "free": [{"start": start, "end": end} for start, end in slots],
+                    }
+                    for service_provider, slots in free.items()
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ServiceProviderProfile(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, id):
+        if not (entry := provider_profile(id)):
+            return Response(
+                {"message": "Invalid User ID"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        etag, profile = entry
+        owner = request.user.id == id
+        if not owner:
+            # other users only see when the provider is busy, not with whom
+            profile = {
+                **profile,
+                "upcoming_schedules": [
+                    {
+                        "date_and_time": schedule["date_and_time"],
+                        "duration": schedule["duration"],
+                    }
+                    for schedule in profile["upcoming_schedules"]
+                ],
+            }
+        return conditional_response(
+            request,
+            lambda: Response(profile, status=status.HTTP_200_OK),
+            etag=make_etag(etag, owner),
+        )
+
+
+class CategoryLeaderboard(APIView):
+    """
+    Top-rated providers of a category, optionally in one ?location=, as
+    ranked by the last refresh_leaderboards run. Every page is a range
+    scan of the leaderboard's rank index.
+    """
+
+    permission_classes = (AllowAny,)
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("location", openapi.IN_QUERY, type=openapi.TYPE_STRING)
+        ]
+    )
+    def get(self, request, category):
+        entries = LeaderboardEntry.objects.filter(
+            service_category=leaderboard_key(category)
+        ).select_related("service_provider")
+        if location := request.query_params.get("location", "").strip():
+            entries = entries.filter(location=leaderboard_key(location)).annotate(
+                rank=F("location_rank")
+            )
+        else:
+            entries = entries.annotate(rank=F("category_rank"))
+
+        paginator = KeysetPagination(ordering=("rank",), page_size=20)
+        page = paginator.paginate_queryset(entries, request, view=self)
+        serializer = LeaderboardEntrySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class ReadSPSchedules(APIView):
     serializer_class = ScheduleSerializer
     permission_classes = (IsAuthenticated,)
 
     def get(self, request):
-        try:
-            schedules = Schedule.objects.filter(service_provider__user=request.user)
-
-            if schedules.exists():
-                serialized_schedules = ScheduleSerializer(schedules)
-                return Response(serialized_schedules.data, status=status.HTTP_200_OK)
-            else:
-                return Response({"schedules": []}, status=status.HTTP_204_NO_CONTENT)
-        except Exception as e:
-            return Response({"error": e}, status=status.HTTP_404_NOT_FOUND)
+        fields = sparse_fieldset(request, ScheduleSerializer)
+        schedules = Schedule.objects.filter(service_provider=request.user)
+        # ETag only, for the same reasons as ReadSPReviews
+        validators = schedules.aggregate(count=Count("id"), latest=Max("updated_at"))
+        if not validators["count"]:
+            return Response({"schedules": []}, status=status.HTTP_204_NO_CONTENT)
+
+        return conditional_response(
+            request,
+            lambda: Response(
+                ScheduleSerializer(
+                    project(schedules, ScheduleSerializer, fields).order_by(
+                        "date_and_time"
+                    ),
+                    many=True,
+                    context={"fields": fields},
+                ).data,
+                status=status.HTTP_200_OK,
+            ),
+            etag=make_etag(validators["count"], validators["latest"], fields),
+        )
 
 
 class ReadUpdateDeleteSchedule(APIView):
@@ -151,7 +414,7 @@ class ReadUpdateDeleteSchedule(APIView):
 
         if schedule := self.get_object(id):
 
-            if schedule.service_provider.user == request.user:
+            if schedule.service_provider_id == request.user.id:
                 serialized_schedule = ScheduleSerializer(schedule, many=False)
 
                 return Response(serialized_schedule.data, status=status.HTTP_200_OK)
@@ -170,7 +433,7 @@ class ReadUpdateDeleteSchedule(APIView):
 
         if schedule := self.get_object(id):
 
-            if schedule.service_provider.user == request.user:
+            if schedule.service_provider_id == request.user.id:
                 customer = (
                     request.data["customer"]
                     if "customer" in request.data.keys()
@@ -221,12 +484,13 @@ class PopulateData(APIView):
         if not Category.objects.all():
             for x in range(1, 11):
                 Category.objects.create(name=f"{choice(name)} {x}")
-                Rating.objects.create(
+                review = Rating.objects.create(
                     service_provider=choice(service_provider),
                     rating=choice(rating),
                     review="This is good :)",
                     customer=choice(customer),
                 )
+                RatingSummary.objects.record(review)
                 Schedule.objects.create(
                     title=choice(title),
                     service_provider=choice(service_provider),
@@ -9,8 +9,80 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from whitenoise import WhiteNoise
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.settings')
 
-application = get_asgi_application()
+# names ManifestStaticFilesStorage hashes, e.g. base.1f418065fc2c.css
+HASHED_FILE = r"\.[0-9a-f]{12}\.\w+$"
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    Django 3.2 iterates streaming responses on the event loop, where a
+    generator reading from the database (such as an export) fails. Their
+    parts are pulled on the request's own thread instead, the one its
+    sync view ran on, so a server-side cursor keeps its connection.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        # Django sends the headers and the closing message; the body goes
+        # out just before the latter
+        response.streaming_content = ()
+
+        async def send_parts(message):
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                while (part := await next_part(parts, None)) is not None:
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": chunk,
+                                "more_body": True,
+                            }
+                        )
+            await send(message)
+
+        await super().send_response(response, send_parts)
+
+
+def not_found(environ, start_response):
+    start_response("404 Not Found", [("Content-Type", "text/plain")])
+    return [b"Not Found"]
+
+
+def static_files(root, prefix):
+    """
+    WhiteNoise serving the collected files under `root`, hashed names
+    included, as an ASGI app. The WhiteNoise middleware is sync-only, so
+    it is left out of the ASGI middleware chain and mounted here instead.
+    """
+    return WsgiToAsgi(
+        WhiteNoise(not_found, root=root, prefix=prefix, immutable_file_test=HASHED_FILE)
+    )
+
+
+# as get_asgi_application(), with the handler above
+django.setup(set_prefix=False)
+django_application = StreamingASGIHandler()
+static_application = static_files(settings.STATIC_ROOT, settings.STATIC_URL)
+
+
+async def application(scope, receive, send):
+    # Django 3.2 runs every sync view of every request on one shared thread
+    # unless each request has a context of its own
+    async with ThreadSensitiveContext():
+        if scope["type"] == "http" and scope["path"].startswith(settings.STATIC_URL):
+            await static_application(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
@@ -0,0 +1,85 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.views import APIView
+
+
+@functools.lru_cache(maxsize=None)
+def database_executor(max_workers):
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+
+def database_sync_to_async(func):
+    """
+    sync_to_async for code that touches the database or the cache.
+
+    Under ASGI it runs on a pool of ASYNC_DB_THREADS threads, so no more
+    requests hit the database at once than the connection pool can serve,
+    and the thread's connection goes back to the pool after every call.
+    Otherwise it runs on the request's own thread, as a sync view would.
+    """
+    if not settings.ASGI_MODE:
+        return sync_to_async(func, thread_sensitive=True)
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(
+        call,
+        thread_sensitive=False,
+        executor=database_executor(settings.ASYNC_DB_THREADS),
+    )
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be coroutines. Authentication, permission
+    checks and any handler left sync run through database_sync_to_async,
+    so under ASGI a request waiting on I/O does not hold a thread. Under
+    WSGI Django runs the view through async_to_sync, so it works there too.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        # keeps csrf_exempt, cls and initkwargs, which urls and drf_yasg read
+        return functools.update_wrapper(async_view, view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await database_sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await database_sync_to_async(handler)(
+                    request, *args, **kwargs
+                )
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware, negotiated from Accept-Encoding, that leaves responses
+    under GZIP_MIN_LENGTH bytes alone: they fit in a packet or two either
+    way, so compressing them costs CPU and saves no round trips.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.GZIP_MIN_LENGTH:
+            return response
+        return super().process_response(request, response)
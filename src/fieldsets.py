@@ -0,0 +1,72 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin limiting the output to the names in context["fields"],
+    as parsed by sparse_fieldset(). Without it every field is rendered.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        if requested is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
+
+
+def sparse_fieldset(request, serializer_class):
+    """
+    Field names from ?fields=a,b,c, or None when the client wants them all.
+    Unknown or write-only names are a 400.
+    """
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    readable = {
+        name
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    }
+    if unknown := requested - readable:
+        raise ValidationError(
+            {"fields": f"Unknown fields: {', '.join(sorted(unknown))}"}
+        )
+    return requested
+
+
+def project(queryset, serializer_class, fields, always=()):
+    """
+    Load only the columns behind the serializer `fields`, plus `always`
+    (e.g. the keyset ordering, which the paginator reads back off the last
+    row). The queryset is left as is when `fields` is None or one of them
+    cannot be traced to a model field.
+    """
+    if fields is None:
+        return queryset
+
+    opts = queryset.model._meta
+    serializer_fields = serializer_class().fields
+
+    def model_field(name):
+        name = name.lstrip("-")
+        if name == "pk":
+            return name
+        try:
+            opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        return name
+
+    columns = {column for column in map(model_field, always) if column}
+    for name in fields:
+        source = serializer_fields[name].source
+        # method fields are named after the relation they read
+        root = model_field(name if source == "*" else source.split(".")[0])
+        if root is None:
+            return queryset
+        columns.add(root)
+    return queryset.only(*columns)
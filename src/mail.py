@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import boto3
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import EmailOutbox
+
+
+class SESEmailBackend(BaseEmailBackend):
+    """
+    Django email backend over the SES API. One boto3 client, and so one
+    pooled HTTPS connection, is shared by every message of a batch.
+    """
+
+    client = None
+
+    def open(self):
+        if self.client is None:
+            self.client = boto3.client(
+                "ses",
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_KEY,
+                region_name=settings.AWS_REGION,
+            )
+            return True
+        return False
+
+    def send_messages(self, email_messages):
+        self.open()
+        sent = 0
+        for message in email_messages:
+            html = next(
+                (body for body, mimetype in getattr(message, "alternatives", [])
+                 if mimetype == "text/html"),
+                message.body,
+            )
+            try:
+                self.client.send_email(
+                    # using user's email after amazon verification
+                    Destination={"ToAddresses": [settings.RECIPIENT]},
+                    Message={
+                        "Body": {
+                            "Html": {"Charset": settings.CHARSET, "Data": html},
+                            "Text": {"Charset": settings.CHARSET, "Data": message.body},
+                        },
+                        "Subject": {"Charset": settings.CHARSET, "Data": message.subject},
+                    },
+                    Source=settings.SENDER,
+                )
+            except ClientError:
+                if not self.fail_silently:
+                    raise
+            else:
+                sent += 1
+        return sent
+
+
+def retry_delay(attempts):
+    """Exponential backoff, capped, for the n-th failed attempt."""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim_outbox_batch(batch_size):
+    """
+    Lease up to `batch_size` due outbox rows to the caller for
+    EMAIL_OUTBOX_LEASE seconds by moving their next attempt past it, and
+    count the attempt. Rows are locked with SKIP LOCKED just long enough
+    to do so, and should the caller die mid-batch they fall due again
+    once the lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        for email in batch:
+            email.attempts += 1
+            email.next_attempt_at = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        EmailOutbox.objects.bulk_update(batch, ["attempts", "next_attempt_at"])
+    return batch
+
+
+def send_outbox_batch(batch_size=50):
+    """
+    Claim up to `batch_size` due outbox rows and push them through
+    EMAIL_OUTBOX_BACKEND on a single connection. The rows are claimed in
+    a transaction of their own and sent outside of it, so several workers
+    can drain the outbox side by side without holding locks over the
+    network. Returns the number of rows claimed.
+    """
+    batch = claim_outbox_batch(batch_size)
+    if not batch:
+        return 0
+
+    with get_connection(settings.EMAIL_OUTBOX_BACKEND) as connection:
+        for email in batch:
+            message = EmailMultiAlternatives(
+                subject=email.subject,
+                body=email.body,
+                from_email=settings.SENDER,
+                to=[email.to_email],
+                connection=connection,
+            )
+            message.attach_alternative(email.body, "text/html")
+            try:
+                message.send()
+            except Exception as e:
+                email.last_error = str(e)
+                if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    email.status = "failed"
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(
+                        email.attempts
+                    )
+            else:
+                email.status = "sent"
+                email.sent_at = timezone.now()
+
+    EmailOutbox.objects.bulk_update(
+        batch, ["status", "next_attempt_at", "last_error", "sent_at"]
+    )
+    return len(batch)
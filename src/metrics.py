@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+# the workers whose numbers are in the cache
+WORKERS_KEY = "metrics:workers"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    Per-view request metrics of this process. Recording is a dict lookup
+    and a few additions under one lock, cheap enough to leave on.
+
+    Every METRICS_PUBLISH_INTERVAL seconds a process copies its numbers to
+    the shared cache, and a scrape adds up those of every worker, whichever
+    worker serves it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self.clear()
+
+    def clear(self):
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+        self.db_seconds = defaultdict(float)
+        self.n_plus_one = defaultdict(int)
+        self.published = 0.0
+
+    def record(self, view, method, status, seconds, queries, db_seconds, repeated):
+        with self._lock:
+            self.latency[(view, method, status)].observe(seconds)
+            self.queries[(view, method)].observe(queries)
+            self.db_seconds[(view, method)] += db_seconds
+            if repeated:
+                self.n_plus_one[(view, method)] += 1
+        if time.monotonic() - self.published >= settings.METRICS_PUBLISH_INTERVAL:
+            self.publish()
+
+    @property
+    def worker(self):
+        # workers forked from a preloaded master inherit its registry
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._worker = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex}"
+        return self._worker
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "latency": {
+                    key: (list(histogram.counts), histogram.sum)
+                    for key, histogram in self.latency.items()
+                },
+                "queries": {
+                    key: (list(histogram.counts), histogram.sum)
+                    for key, histogram in self.queries.items()
+                },
+                "db_seconds": dict(self.db_seconds),
+                "n_plus_one": dict(self.n_plus_one),
+            }
+
+    def publish(self):
+        self.published = time.monotonic()
+        cache = caches[settings.METRICS_CACHE_ALIAS]
+        worker = self.worker
+        cache.set(
+            f"metrics:worker:{worker}",
+            self.snapshot(),
+            timeout=settings.METRICS_WORKER_TTL,
+        )
+        # a worker lost to a concurrent update is added back next time
+        workers = cache.get(WORKERS_KEY, [])
+        if worker not in workers:
+            cache.set(WORKERS_KEY, workers + [worker], timeout=None)
+
+    def collect(self):
+        """The numbers of every worker that published lately, summed."""
+        self.publish()
+        cache = caches[settings.METRICS_CACHE_ALIAS]
+        workers = cache.get(WORKERS_KEY, [])
+        snapshots = cache.get_many([f"metrics:worker:{worker}" for worker in workers])
+        if len(snapshots) < len(workers):
+            # workers gone for METRICS_WORKER_TTL
+            cache.set(
+                WORKERS_KEY,
+                [w for w in workers if f"metrics:worker:{w}" in snapshots],
+                timeout=None,
+            )
+        return merge(snapshots.values())
+
+
+def merge(snapshots):
+    total = {"latency": {}, "queries": {}, "db_seconds": {}, "n_plus_one": {}}
+    for snapshot in snapshots:
+        for name in ("latency", "queries"):
+            for key, (counts, seconds) in snapshot[name].items():
+                summed, summed_seconds = total[name].get(key, ([0] * len(counts), 0))
+                total[name][key] = (
+                    [a + b for a, b in zip(summed, counts)],
+                    summed_seconds + seconds,
+                )
+        for name in ("db_seconds", "n_plus_one"):
+            for key, value in snapshot[name].items():
+                total[name][key] = total[name].get(key, 0) + value
+    return total
+
+
+def render(snapshot):
+    """A snapshot in Prometheus text exposition format."""
+    lines = [
+        "# HELP http_request_duration_seconds Request latency per view.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (view, method, status), histogram in sorted(snapshot["latency"].items()):
+        labels = f'view="{view}",method="{method}",status="{status}"'
+        lines += histogram_lines(
+            "http_request_duration_seconds", labels, LATENCY_BUCKETS, *histogram
+        )
+
+    lines += [
+        "# HELP http_request_db_queries SQL queries issued per request.",
+        "# TYPE http_request_db_queries histogram",
+    ]
+    for (view, method), histogram in sorted(snapshot["queries"].items()):
+        labels = f'view="{view}",method="{method}"'
+        lines += histogram_lines(
+            "http_request_db_queries", labels, QUERY_BUCKETS, *histogram
+        )
+
+    lines += [
+        "# HELP http_request_db_seconds_total Time spent in SQL per view.",
+        "# TYPE http_request_db_seconds_total counter",
+    ]
+    for (view, method), seconds in sorted(snapshot["db_seconds"].items()):
+        lines.append(
+            f'http_request_db_seconds_total{{view="{view}",method="{method}"}} {seconds}'
+        )
+
+    lines += [
+        "# HELP http_request_n_plus_one_total Requests that repeated an identical query.",
+        "# TYPE http_request_n_plus_one_total counter",
+    ]
+    for (view, method), count in sorted(snapshot["n_plus_one"].items()):
+        lines.append(
+            f'http_request_n_plus_one_total{{view="{view}",method="{method}"}} {count}'
+        )
+    return "\n".join(lines) + "\n"
+
+
+def histogram_lines(name, labels, buckets, counts, seconds):
+    cumulative = 0
+    for bound, count in zip(buckets, counts):
+        cumulative += count
+        yield f'{name}_bucket{{{labels},le="{float(bound)!r}"}} {cumulative}'
+    yield f'{name}_bucket{{{labels},le="+Inf"}} {sum(counts)}'
+    yield f"{name}_sum{{{labels}}} {seconds}"
+    yield f"{name}_count{{{labels}}} {sum(counts)}"
+
+
+registry = Registry()
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper hook counting statements and the time
+    spent in them. Statements are keyed by their SQL before parameters
+    are bound, so a query repeated for every row of a list shows up as
+    one statement with a high count.
+    """
+
+    def __init__(self):
+        self.statements = Counter()
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    @property
+    def count(self):
+        return sum(self.statements.values())
+
+    def repeated(self, threshold):
+        return [sql for sql, count in self.statements.items() if count >= threshold]
+
+
+current_recorder = ContextVar("query_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def hook_new_connection(sender, connection, **kwargs):
+    install_query_hook(connection)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count and DB time for every request,
+    labelled by the view that served it, and logs probable N+1 queries:
+    identical statements issued METRICS_N_PLUS_ONE_THRESHOLD times or
+    more within one request.
+
+    The request's QueryRecorder is found through a context variable, so
+    queries are counted whichever thread an async view runs them on.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # as MiddlewareMixin does, so Django awaits __call__
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            # connections opened before this module was loaded
+            for alias in connections:
+                install_query_hook(connections[alias])
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, recorder, elapsed):
+        view = getattr(request, "metrics_view", None)
+        if view is None:
+            return
+
+        repeated = recorder.repeated(settings.METRICS_N_PLUS_ONE_THRESHOLD)
+        for sql in repeated:
+            logger.warning(
+                "Probable N+1 in %s %s: %d identical queries: %s",
+                request.method,
+                view,
+                recorder.statements[sql],
+                sql,
+            )
+        registry.record(
+            view,
+            request.method,
+            response.status_code,
+            elapsed,
+            recorder.count,
+            recorder.seconds,
+            bool(repeated),
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if view_func is not metrics:
+            request.metrics_view = f"{view_func.__module__}.{view_func.__name__}"
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint, only answered for METRICS_ALLOWED_IPS, the
+    client address being read as the throttles read it, behind NUM_PROXIES.
+    """
+    if BaseThrottle().get_ident(request) not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        render(registry.collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,63 @@
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class OTPStore:
+    """
+    One-time codes kept in the cache under (user, phone number), so phone
+    verification needs neither a session nor a DB write until it succeeds.
+    Only an HMAC of the code is stored. Failed attempts are counted with an
+    atomic cache increment and the code is burnt after OTP_MAX_ATTEMPTS.
+    """
+
+    prefix = "otp"
+
+    @property
+    def cache(self):
+        return caches[settings.OTP_CACHE_ALIAS]
+
+    def key(self, user, number):
+        return f"{self.prefix}:{user.pk}:{number}"
+
+    def digest(self, key, code):
+        return hmac.new(
+            settings.SECRET_KEY.encode(), f"{key}:{code}".encode(), hashlib.sha256
+        ).hexdigest()
+
+    def save(self, user, number, code):
+        key = self.key(user, number)
+        self.cache.set_many(
+            {key: self.digest(key, code), f"{key}:attempts": 0},
+            timeout=settings.OTP_TTL,
+        )
+
+    def discard(self, user, number):
+        key = self.key(user, number)
+        self.cache.delete_many([key, f"{key}:attempts"])
+
+    def verify(self, user, number, code) -> dict:
+        key = self.key(user, number)
+        expected = self.cache.get(key)
+        if expected is None:
+            return {"status": False, "message": "OTP expired or not requested"}
+
+        try:
+            attempts = self.cache.incr(f"{key}:attempts")
+        except ValueError:
+            # the counter expired between the two reads
+            return {"status": False, "message": "OTP expired or not requested"}
+        if attempts > settings.OTP_MAX_ATTEMPTS:
+            self.discard(user, number)
+            return {"status": False, "message": "Too many attempts, request a new OTP"}
+
+        if not hmac.compare_digest(expected, self.digest(key, str(code))):
+            return {"status": False, "message": "OTP Incorrect!"}
+
+        self.discard(user, number)
+        return {"status": True, "message": "OTP Code Verified"}
+
+
+otp_store = OTPStore()
@@ -0,0 +1,118 @@
+import datetime
+import uuid
+
+from django.core import signing
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique ordering, e.g. ("rated_at", "id").
+    The cursor carries the ordering values of the last row served, so every
+    page is an index range scan from that row, whatever its depth.
+    Prefix a field with "-" to walk it in descending order.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+    salt = "src.pagination.KeysetPagination"
+
+    def __init__(self, ordering, page_size=None):
+        self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        limit = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(cursor))
+
+        rows = list(queryset[: limit + 1])
+        self.has_next = len(rows) > limit
+        self.page = rows[:limit]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_keyset_filter(self, values):
+        """
+        Rows strictly after `values` in the ordering:
+        (a > x) OR (a = x AND b > y) ..., bounded below by the leading column
+        so the planner can start the index scan at the cursor.
+        """
+        keyset = Q()
+        for position, field in enumerate(self.ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            clause = Q(**{f"{field.lstrip('-')}__{lookup}": values[position]})
+            for previous, value in zip(self.ordering[:position], values):
+                clause &= Q(**{previous.lstrip("-"): value})
+            keyset |= clause
+
+        leading = self.ordering[0]
+        bound = "lte" if leading.startswith("-") else "gte"
+        return Q(**{f"{leading.lstrip('-')}__{bound}": values[0]}) & keyset
+
+    def encode_cursor(self, instance):
+        values = [
+            self._to_primitive(getattr(instance, field.lstrip("-")))
+            for field in self.ordering
+        ]
+        return signing.dumps(values, salt=self.salt)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = signing.loads(encoded, salt=self.salt)
+        except signing.BadSignature:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def _to_primitive(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return value
@@ -0,0 +1,195 @@
+"""
+PostgreSQL backend handing out connections from a per-process pool.
+
+Django closes its connection at the end of every request (CONN_MAX_AGE=0);
+with this backend that returns the connection to the pool instead, so
+requests skip the TCP/TLS handshake and authentication. Configure it with a
+POOL entry next to ENGINE:
+
+    "POOL": {
+        "MIN_SIZE": 2,
+        "MAX_SIZE": 10,
+        "MAX_LIFETIME": 1800,
+        "TIMEOUT": 10,
+        "IDLE_CHECK": 30,
+    }
+"""
+import threading
+import time
+
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base, creation
+from django.utils.asyncio import async_unsafe
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+POOL_DEFAULTS = {
+    "MIN_SIZE": 2,
+    "MAX_SIZE": 10,
+    "MAX_LIFETIME": 30 * 60,
+    "TIMEOUT": 10,
+    "IDLE_CHECK": 30,
+}
+
+
+class ConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that waits up to `timeout` seconds for a free
+    connection instead of failing once `maxconn` are checked out, pings
+    connections idle for over `idle_check` seconds on checkout and retires
+    them after `max_lifetime` seconds. `minconn` connections are opened up
+    front and up to `maxconn` idle ones are kept open.
+    """
+
+    def __init__(self, minconn, maxconn, max_lifetime, timeout, idle_check, **kwargs):
+        self.database = kwargs["database"]
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._opened = {}  # id(connection) -> time.monotonic() it was opened
+        self._idle = {}  # id(connection) -> time.monotonic() it was checked in
+        super().__init__(minconn, maxconn, **kwargs)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        self._opened[id(conn)] = time.monotonic()
+        return conn
+
+    def expired(self, conn):
+        return time.monotonic() - self._opened[id(conn)] >= self.max_lifetime
+
+    def _putconn(self, conn, key=None, close=False):
+        # psycopg2 closes the connection once `minconn` are idle, which would
+        # churn connections between requests; the slots already cap idle
+        # connections at `maxconn`. Called under the pool's lock.
+        minconn, self.minconn = self.minconn, self.maxconn
+        try:
+            super()._putconn(conn, key, close)
+        finally:
+            self.minconn = minconn
+
+    def healthy(self, conn):
+        if conn.closed or self.expired(conn):
+            return False
+        idle_since = self._idle.pop(id(conn), None)
+        # fresh connections and recently used ones are trusted
+        if idle_since is None or time.monotonic() - idle_since < self.idle_check:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not conn.autocommit:
+                conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def discard(self, conn):
+        self._opened.pop(id(conn), None)
+        self._idle.pop(id(conn), None)
+        self.putconn(conn, close=True)
+
+    def checkout(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"no connection free after {self.timeout}s")
+        try:
+            # every idle connection may have been dropped by the server
+            for _ in range(self.minconn + 1):
+                conn = self.getconn()
+                if self.healthy(conn):
+                    return conn
+                self.discard(conn)
+            raise PoolError("could not get a usable connection")
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def checkin(self, conn):
+        try:
+            if self.closed:
+                conn.close()
+            elif conn.closed or self.expired(conn):
+                self.discard(conn)
+            else:
+                self._idle[id(conn)] = time.monotonic()
+                self.putconn(conn)
+                if conn.closed:
+                    # psycopg2 found the server connection lost
+                    self._opened.pop(id(conn), None)
+                    self._idle.pop(id(conn), None)
+        finally:
+            self._slots.release()
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(conn_params, options):
+    key = repr(sorted(conn_params.items()))
+    with pools_lock:
+        if key not in pools:
+            options = {**POOL_DEFAULTS, **options}
+            pools[key] = ConnectionPool(
+                options["MIN_SIZE"],
+                options["MAX_SIZE"],
+                options["MAX_LIFETIME"],
+                options["TIMEOUT"],
+                options["IDLE_CHECK"],
+                **conn_params,
+            )
+        return pools[key]
+
+
+def close_pools(database):
+    """Close every pool connected to `database`, e.g. before dropping it."""
+    with pools_lock:
+        for key, pool in list(pools.items()):
+            if pool.database == database:
+                pool.closeall()
+                del pools[key]
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # idle pooled connections would keep the test database in use
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    pool = None
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        # NAME is None only for the maintenance connections used to create
+        # and drop databases, which are not worth pooling
+        if self.settings_dict["NAME"] is None:
+            self.pool = None
+            return super().get_new_connection(conn_params)
+
+        self.pool = get_pool(conn_params, self.settings_dict.get("POOL", {}))
+        connection = self.pool.checkout()
+
+        # as in the postgresql backend
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.checkin(self.connection)
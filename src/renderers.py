@@ -0,0 +1,38 @@
+import orjson
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# UUIDs, dates and times are serialized by orjson itself
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+encoder = JSONEncoder()
+
+
+def default(obj):
+    """Types orjson does not know: phone numbers, then whatever DRF's encoder does."""
+    if isinstance(obj, PhoneNumber):
+        return str(obj)
+    return encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same documents with orjson, several times
+    faster on large lists. Times keep their microseconds where DRF cuts
+    them to milliseconds, and `indent` always means two spaces.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        options = OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        content = orjson.dumps(data, default=default, option=options)
+
+        # as JSONRenderer does, so the output is also valid javascript
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
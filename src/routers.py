@@ -0,0 +1,131 @@
+import asyncio
+import random
+from contextvars import ContextVar
+
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import decode_token
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingState:
+    """Whether the current request may read from a replica, and whether it wrote."""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+# unset outside requests (shell, commands, workers): everything hits the primary
+routing_state = ContextVar("routing_state", default=None)
+
+
+class ReplicaRouter:
+    """
+    Reads go to a random alias of REPLICA_DATABASES when the current request
+    allows it (see ReplicaMiddleware), everything else goes to the primary.
+    Reads inside a transaction and after the request's first write stay on
+    the primary, so a request always sees its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (
+            state is None
+            or not state.use_replica
+            or not settings.REPLICA_DATABASES
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        if state := routing_state.get():
+            state.wrote = True
+            state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def pin_key(request):
+    """
+    Who to pin to the primary: the user id from the (cached) JWT claims when
+    the request carries a valid access token, the client address otherwise.
+    """
+    header = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if len(header) == 2 and header[0] == "Bearer":
+        try:
+            claims = decode_token(header[1])
+        except jwt.InvalidTokenError:
+            claims = {}
+        if user_id := claims.get(api_settings.USER_ID_CLAIM):
+            return f"primary-pin:user:{user_id}"
+    return f"primary-pin:ip:{request.META.get('REMOTE_ADDR')}"
+
+
+class ReplicaMiddleware:
+    """
+    Lets safe-method requests read from the replicas, unless the same user
+    (or address) wrote within the last REPLICA_PIN_SECONDS: replication lag
+    would otherwise hide their own writes from them. Any write, including
+    one made while serving a GET, pins the user again.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # as MiddlewareMixin does, so Django awaits __call__
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        key = pin_key(request)
+        state = RoutingState(request.method in SAFE_METHODS and not cache.get(key))
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if state.wrote or request.method not in SAFE_METHODS:
+            cache.set(key, True, timeout=settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+
+        key = pin_key(request)
+        pinned = await sync_to_async(cache.get)(key)
+        state = RoutingState(request.method in SAFE_METHODS and not pinned)
+        # copied into the threads sync code runs on, so the router sees it
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if state.wrote or request.method not in SAFE_METHODS:
+            await sync_to_async(cache.set)(
+                key, True, timeout=settings.REPLICA_PIN_SECONDS
+            )
+        return response
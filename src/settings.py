@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 import dj_database_url
 import django_heroku
@@ -67,6 +67,9 @@ INSTALLED_APPS = [
 SITE_ID=1
 
 MIDDLEWARE = [
+    'src.metrics.MetricsMiddleware',
+    'src.routers.ReplicaMiddleware',
+    'src.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -107,10 +110,40 @@ REST_FRAMEWORK = {
     #     'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
     # ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
-    ]
+        'src.tokens.CachedJWTAuthentication'
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'src.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'src.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # token buckets of src.throttling, per view throttle_scope: "<scope>.ip"
+    # per client address, "<scope>.identity" per account
+    'DEFAULT_THROTTLE_RATES': {
+        'login.ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login.identity': config('THROTTLE_LOGIN_IDENTITY', default='10/min'),
+        'otp.ip': config('THROTTLE_OTP_IP', default='30/min'),
+        'otp.identity': config('THROTTLE_OTP_IDENTITY', default='10/min'),
+        'password_reset.ip': config('THROTTLE_PASSWORD_RESET_IP', default='10/min'),
+        'password_reset.identity': config('THROTTLE_PASSWORD_RESET_IDENTITY', default='3/min'),
+    },
+    # proxies in front of the app, so client addresses are read from
+    # X-Forwarded-For; 0 trusts REMOTE_ADDR only. Heroku's router is one
+    # (it sets DYNO on every dyno): without it every client would share
+    # the router's few addresses, and their throttle buckets
+    'NUM_PROXIES': config('NUM_PROXIES', default=1 if 'DYNO' in os.environ else 0, cast=int),
 }
 
+# responses smaller than this many bytes are sent uncompressed
+GZIP_MIN_LENGTH = config('GZIP_MIN_LENGTH', default=1024, cast=int)
+
+# throttle buckets must be shared by every worker to hold across them
+THROTTLE_CACHE_ALIAS = 'default'
+
 
 WSGI_APPLICATION = 'src.wsgi.application'
 
@@ -118,7 +151,7 @@ WSGI_APPLICATION = 'src.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-prod_db = dj_database_url.config(conn_max_age=500)
+prod_db = dj_database_url.config()
 
 
 HEROKU = config("HEROKU", cast=bool)
@@ -140,9 +173,38 @@ else:
         }
     }
 
+# Read replicas
+# safe-method requests read from these unless the user wrote in the last
+# REPLICA_PIN_SECONDS; pins live in the cache, so share it between workers.
+# Pointing a replica URL at the primary's own database is enough to try the
+# routing locally.
+
+REPLICA_DATABASES = []
+for index, url in enumerate(config("REPLICA_DATABASE_URLS", default="", cast=Csv()), 1):
+    alias = f"replica_{index}"
+    DATABASES[alias] = dj_database_url.parse(url)
+    # tests read through the primary's test database
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['src.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=5, cast=int)
+
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+
+# Cache
+# local memory per process by default; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared cache (e.g. memcached) in production so every worker sees the same data
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -197,18 +259,78 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# verified token claims kept per process, and users looked up from tokens
+JWT_CLAIMS_CACHE_SIZE = 10000
+JWT_USER_CACHE_TTL = 30     # seconds
+
 
 
 
 # Activate Django-Heroku.
 django_heroku.settings(locals())
 
+# Connection pooling
+# applied after django_heroku, which replaces the default database on Heroku.
+# Django hands its connection back at the end of every request, so the pool
+# only has to be as large as the number of threads per process.
+
+DATABASE_POOL = {
+    "MIN_SIZE": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+    "MAX_SIZE": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+    "MAX_LIFETIME": config("DB_POOL_MAX_LIFETIME", default=30 * 60, cast=int),   # seconds
+    "TIMEOUT": config("DB_POOL_TIMEOUT", default=10, cast=int),     # seconds waiting for a free connection
+    "IDLE_CHECK": config("DB_POOL_IDLE_CHECK", default=30, cast=int),   # seconds idle before a checkout pings it
+}
+
+for database in DATABASES.values():
+    # dj_database_url still names the backend postgresql_psycopg2
+    if database.get("ENGINE", "").startswith("django.db.backends.postgresql"):
+        database.update(ENGINE="src.pooled_postgresql", CONN_MAX_AGE=0, POOL=DATABASE_POOL)
+
+# ASGI
+# set ASGI_MODE to serve src.asgi under uvicorn workers (see gunicorn.conf.py).
+# Async views run their database work on ASYNC_DB_THREADS threads, no more
+# than the pool has connections. WhiteNoise's middleware is sync only and
+# would put every request through one thread, so src.asgi serves static
+# files instead.
+
+ASGI_MODE = config("ASGI_MODE", default=False, cast=bool)
+ASYNC_DB_THREADS = config("ASYNC_DB_THREADS", default=DATABASE_POOL["MAX_SIZE"], cast=int)
+
+if ASGI_MODE:
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE
+        if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware'
+    ]
+
 # TWILIO CONFIG FILES 
 ACCOUNT_SID     = config("ACCOUNT_SID")
 AUTH_TOKEN      = config("AUTH_TOKEN")
 MESSAGE_SERVICE = config('MESSAGE_SERVICE')
 TO              = config('TO')
 
+# SMS
+# sent from background threads of each process (see src.sms.SMSDispatcher);
+# ConsoleSMSBackend and LocmemSMSBackend work without Twilio
+SMS_BACKEND          = config('SMS_BACKEND', default='src.sms.TwilioSMSBackend')
+SMS_DISPATCH_THREADS = 2
+SMS_MAX_ATTEMPTS     = 4
+SMS_RETRY_DELAY      = 2           # seconds, doubled on every failed attempt
+SMS_TIMEOUT          = 10          # seconds per provider request
+
+# OTP
+OTP_CACHE_ALIAS  = 'default'
+OTP_LENGTH       = 5
+OTP_TTL          = 5 * 60      # seconds
+OTP_MAX_ATTEMPTS = 5
+
+# Leaderboards
+# rebuilt by `manage.py refresh_leaderboards`; a provider needs about
+# LEADERBOARD_PRIOR_WEIGHT reviews before their own mean outweighs their
+# category's
+LEADERBOARD_PRIOR_WEIGHT      = config('LEADERBOARD_PRIOR_WEIGHT', default=10, cast=int)
+LEADERBOARD_REFRESH_INTERVAL  = config('LEADERBOARD_REFRESH_INTERVAL', default=300, cast=int)  # seconds
+
 # AMAZON SES CONFIG FILES 
 AWS_ACCESS_KEY_ID = config("AWS_ACCESS_KEY_ID")
 AWS_SECRET_KEY    = config("AWS_SECRET_KEY")
@@ -216,3 +338,21 @@ CHARSET = "UTF-8"
 AWS_REGION = "us-east-1"
 SENDER = config('SENDER')
 RECIPIENT = config('RECIPIENT')
+
+# EMAIL OUTBOX
+# any Django email backend; console/filebased work without AWS
+EMAIL_OUTBOX_BACKEND = config('EMAIL_OUTBOX_BACKEND', default='src.mail.SESEmailBackend')
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = 30           # seconds, doubled on every failed attempt
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+EMAIL_OUTBOX_LEASE = 5 * 60             # seconds a worker has to send a claimed batch
+
+# METRICS
+# request metrics, scraped from /metrics by these addresses only; every worker
+# copies its numbers to the cache, which must be shared for a scrape to see
+# them all, and a worker that stops publishing drops out after the TTL
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1', cast=Csv())
+METRICS_CACHE_ALIAS = 'default'
+METRICS_PUBLISH_INTERVAL = 10   # seconds
+METRICS_WORKER_TTL = 24 * 60 * 60   # seconds
+METRICS_N_PLUS_ONE_THRESHOLD = 5    # identical queries in one request
@@ -0,0 +1,164 @@
+import atexit
+import logging
+import sys
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+logger = logging.getLogger(__name__)
+
+# messages "sent" through LocmemSMSBackend, for tests
+outbox = []
+
+SMS = namedtuple("SMS", "to body")
+
+
+class BaseSMSBackend:
+    def send(self, to, body):
+        raise NotImplementedError
+
+
+class TwilioSMSBackend(BaseSMSBackend):
+    """
+    Sends through the Twilio API. The backend lives as long as the process,
+    so one client, and so one pooled HTTPS session, serves every message.
+    """
+
+    def __init__(self):
+        self.client = Client(
+            settings.ACCOUNT_SID,
+            settings.AUTH_TOKEN,
+            http_client=TwilioHttpClient(
+                pool_connections=True, timeout=settings.SMS_TIMEOUT
+            ),
+        )
+
+    def send(self, to, body):
+        self.client.messages.create(from_=settings.MESSAGE_SERVICE, to=to, body=body)
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    def send(self, to, body):
+        sys.stdout.write(f"SMS to {to}: {body}\n")
+        sys.stdout.flush()
+
+
+class LocmemSMSBackend(BaseSMSBackend):
+    def send(self, to, body):
+        outbox.append(SMS(to, body))
+
+
+@lru_cache(maxsize=None)
+def get_backend(path):
+    return import_string(path)()
+
+
+Pending = namedtuple("Pending", "backend body attempts due")
+
+
+def retry_delay(attempts):
+    """Exponential backoff, in seconds, for the n-th failed attempt."""
+    return settings.SMS_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+class SMSDispatcher:
+    """
+    Sends SMS from background threads, so a request that queues one returns
+    without waiting on the provider. At most one message per number waits
+    at a time: queueing another for the same number replaces it, so a user
+    who asks for three codes in a row is texted the last one only. Failed
+    sends are retried with exponential backoff up to SMS_MAX_ATTEMPTS.
+
+    Messages live in memory: ones still waiting when the process dies are
+    lost, which for OTPs only means the user asks for a new code.
+    """
+
+    def __init__(self):
+        self._pending = {}  # number -> Pending
+        self._sending = 0
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def queue(self, to, body):
+        with self._condition:
+            self._pending[to] = Pending(settings.SMS_BACKEND, body, 0, time.monotonic())
+            self._condition.notify_all()
+            self._start()
+
+    def _start(self):
+        # also restarts the threads in a worker forked after they started
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < settings.SMS_DISPATCH_THREADS:
+            thread = threading.Thread(target=self._run, name="sms", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next(self):
+        """Wait for the earliest due message and take it, holding the lock."""
+        while True:
+            now = time.monotonic()
+            if self._pending:
+                to, message = min(self._pending.items(), key=lambda item: item[1].due)
+                if message.due <= now:
+                    del self._pending[to]
+                    self._sending += 1
+                    return to, message
+                self._condition.wait(message.due - now)
+            else:
+                self._condition.wait()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                to, message = self._next()
+            try:
+                get_backend(message.backend).send(to, message.body)
+            except Exception:
+                self._failed(to, message)
+            finally:
+                with self._condition:
+                    self._sending -= 1
+                    self._condition.notify_all()
+
+    def _failed(self, to, message):
+        attempts = message.attempts + 1
+        if attempts >= settings.SMS_MAX_ATTEMPTS:
+            logger.exception("Giving up on SMS to %s after %d attempts", to, attempts)
+            return
+        logger.warning("SMS to %s failed, attempt %d", to, attempts, exc_info=True)
+        retry = message._replace(
+            attempts=attempts, due=time.monotonic() + retry_delay(attempts)
+        )
+        with self._condition:
+            # a message queued meanwhile supersedes the retry
+            self._pending.setdefault(to, retry)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message has been sent or given up on.
+        Returns False if some are still pending after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._sending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+
+dispatcher = SMSDispatcher()
+# give queued messages a moment to go out on a graceful shutdown
+atexit.register(dispatcher.flush, timeout=5)
+
+
+def queue_sms(to, body):
+    dispatcher.queue(str(to), body)
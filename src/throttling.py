@@ -0,0 +1,132 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+# a bucket is locked for a couple of cache round trips; the lock expires
+# on its own after LOCK_TIMEOUT should its holder die
+LOCK_TIMEOUT = 1  # seconds
+# how long to wait for a bucket other requests are updating, polling
+# from LOCK_RETRY_DELAY up to LOCK_MAX_RETRY_DELAY
+LOCK_WAIT = 0.25
+LOCK_RETRY_DELAY = 0.001
+LOCK_MAX_RETRY_DELAY = 0.02
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): bucket size and seconds to refill it."""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client kept in THROTTLE_CACHE_ALIAS, a cache every
+    worker shares. The bucket for rate "n/period" holds n tokens and
+    refills one every period/n seconds. It is stored as a single number,
+    the GCRA "theoretical arrival time", updated under a short lock taken
+    with cache.add, which is atomic on every backend.
+
+    Views pick their rates with `throttle_scope`: the rate of this throttle
+    is DEFAULT_THROTTLE_RATES["<scope>.<kind>"]. Views without one, or
+    without a rate configured, are not throttled.
+    """
+
+    kind = None
+
+    def __init__(self):
+        self.retry_after = None
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def get_identity(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}.{self.kind}")
+        if scope is None or rate is None:
+            return True
+        identity = self.get_identity(request, view)
+        if identity is None:
+            return True
+
+        digest = hashlib.sha256(str(identity).encode()).hexdigest()
+        return self.consume(f"throttle:{scope}:{self.kind}:{digest}", *parse_rate(rate))
+
+    def consume(self, key, count, period):
+        interval = period / count
+        # a full bucket lets `count` requests through back to back
+        tolerance = interval * (count - 1)
+
+        lock = self.acquire(f"{key}:lock")
+        if lock is None:
+            # only hundreds of concurrent requests on this very bucket hold
+            # it this long, far beyond any rate it is configured for
+            self.retry_after = interval
+            return False
+
+        try:
+            now = time.time()
+            arrival = max(self.cache.get(key, now), now)
+            if arrival - now > tolerance:
+                self.retry_after = arrival - tolerance - now
+                return False
+            arrival += interval
+            self.cache.set(key, arrival, timeout=int(arrival - now) + 1)
+            return True
+        finally:
+            self.release(*lock)
+
+    def acquire(self, lock):
+        """(lock, token) once this request holds `lock`, None after LOCK_WAIT."""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_WAIT
+        delay = LOCK_RETRY_DELAY
+        while not self.cache.add(lock, token, timeout=LOCK_TIMEOUT):
+            if time.monotonic() + delay > deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, LOCK_MAX_RETRY_DELAY)
+        return lock, token
+
+    def release(self, lock, token):
+        # a lock that outlived LOCK_TIMEOUT may already be another request's
+        if self.cache.get(lock) == token:
+            self.cache.delete(lock)
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """Bucket per client address, honouring NUM_PROXIES like DRF's throttles."""
+
+    kind = "ip"
+
+    def get_identity(self, request, view):
+        return self.get_ident(request)
+
+
+class IdentityRateThrottle(TokenBucketThrottle):
+    """
+    Bucket per account: the authenticated user, otherwise the email the
+    request is about, so one account cannot be hammered from many addresses.
+    """
+
+    kind = "identity"
+
+    def get_identity(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        email = request.data.get("email")
+        if isinstance(email, str) and email:
+            return email.strip().lower()
+        return None
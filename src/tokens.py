@@ -0,0 +1,160 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.models import User
+
+
+class ClaimsCache:
+    """
+    Bounded LRU of already-verified JWT claims keyed by a digest of the
+    token, so a token that is presented repeatedly is only verified once.
+    Entries never outlive the token's own `exp`.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, now):
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                return None
+            if claims["exp"] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, key, claims, now):
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            # least recently used entries are the likeliest to have expired
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if len(self._entries) <= self.maxsize and oldest["exp"] > now:
+                    break
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+claims_cache = ClaimsCache(maxsize=settings.JWT_CLAIMS_CACHE_SIZE)
+
+
+def decode_token(token: str) -> dict:
+    """
+    jwt.decode with memoisation; raises the same jwt exceptions.
+    Tokens without an `exp` claim are verified every time. Callers get a
+    copy of the cached claims, free to modify.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    if claims := claims_cache.get(key, now):
+        return dict(claims)
+
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    if "exp" in claims:
+        claims_cache.put(key, dict(claims), now)
+    return claims
+
+
+# what authentication, permission checks and the OTP views read, and
+# updated_at so that save() keeps bumping it
+CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "role",
+    "phone_number",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "is_verified",
+    "phone_verification",
+    "email_verification",
+    "updated_at",
+)
+
+
+def user_cache_key(user_id):
+    return f"user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """
+    User by primary key, served from the cache for JWT_USER_CACHE_TTL
+    seconds. Only CACHED_USER_FIELDS are kept, never the password hash; the
+    user comes back with every other field deferred and save() writes the
+    cached fields only. Reading a deferred field raises FieldError rather
+    than loading it with a query of its own; views needing the whole user
+    fetch it with User.objects.get().
+    """
+    # in model order, which from_db expects of a partial row
+    fields = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in CACHED_USER_FIELDS
+    ]
+    key = user_cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.values_list(*fields).get(id=user_id)
+        cache.set(key, values, timeout=settings.JWT_USER_CACHE_TTL)
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, values)
+    user.refresh_from_db = partial(refresh_cached_user, user)
+    return user
+
+
+def refresh_cached_user(user, using=None, fields=None):
+    """
+    refresh_from_db of cached users. Django lazy-loads a deferred field by
+    refreshing just that field, which is refused here.
+    """
+    if fields is not None and (deferred := user.get_deferred_fields() & set(fields)):
+        raise FieldError(
+            f"User.{', '.join(sorted(deferred))} is not cached for token users"
+        )
+    User.refresh_from_db(user, using=using, fields=fields)
+
+
+def forget_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication resolving the token's user through get_cached_user."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
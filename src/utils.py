@@ -1,61 +1,44 @@
 import re
+import secrets
 import string
-from datetime import time
-from random import choice
 
 import jwt
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from twilio.base.exceptions import TwilioRestException
-from twilio.rest import Client
 from rest_framework_simplejwt.tokens import RefreshToken
-from authentication.models import User
+from authentication.models import EmailOutbox, User
+from src.otp import otp_store
+from src.sms import queue_sms
+from src.tokens import decode_token, get_cached_user
 from django.contrib.auth import authenticate
 
-import boto3
-from botocore.exceptions import ClientError
-
 allowed_characters = set(string.ascii_letters +
                          string.digits + string.punctuation)
-client = boto3.client(
-    'ses',
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_KEY,
-    region_name=settings.AWS_REGION
-)
 
 
 def send_otp(phone):
-    try:
-        account_sid = settings.ACCOUNT_SID
-        auth_token = settings.AUTH_TOKEN
-
-        if phone:
-            # generating otp_code
-            code = [x for x in range(0, 9)]
-            otp_code = "".join([str(choice(code)) for x in range(5)])
-
-            # client = Client(account_sid, auth_token)
-            # # sending message
-            # client.messages.create(
-            #     from_= settings.MESSAGE_SERVICE,
-            #     # to= settings.TO,
-            #     to=str(phone),
-            #     body=f"Your Skill4Cash verification code is {otp_code}, don't share it with anybody."
-            # )
-            return otp_code
-
-    except TwilioRestException:
-        return None
-
-
-def otp_session(request, number):
+    """
+    Generate an OTP code and queue its SMS. Delivery happens on the SMS
+    dispatcher's threads, so this returns without waiting on the provider.
+    """
+    if phone:
+        # generating otp_code
+        otp_code = "".join(
+            secrets.choice(string.digits) for x in range(settings.OTP_LENGTH)
+        )
+        queue_sms(
+            phone,
+            f"Your Skill4Cash verification code is {otp_code}, don't share it with anybody.",
+        )
+        return otp_code
+
+
+def issue_otp(user, number):
 
     otp_code = send_otp(number)
 
     if otp_code:
-        request.session['code'] = otp_code
-        request.session['num'] = number
+        otp_store.save(user, number, otp_code)
         return True
     return None
 
@@ -63,23 +46,14 @@ def otp_session(request, number):
 class Utils:
 
     @staticmethod
-    def sending_email(data):
-        try:
-            response = client.send_email(
-                # using user's email after amazon verification
-                Destination={'ToAddresses': [settings.RECIPIENT,], },
-                Message={
-                    'Body': {'Html': {'Charset': settings.CHARSET, 'Data': data['email_body'], },
-                             'Text': {'Charset': settings.CHARSET, 'Data': data['email_body'], },
-                             },
-                    'Subject': {'Charset': settings.CHARSET, 'Data': data['email_subject'], },
-                },
-                Source=settings.SENDER,
-            )
-        except ClientError as e:
-            return (e.response['Error']['Message'])
-        else:
-            return response['MessageId']
+    def queue_email(data):
+        # delivered by the send_queued_emails worker, so callers can enqueue
+        # inside the same transaction as the write that triggered the email
+        return EmailOutbox.objects.create(
+            to_email=data["to_email"],
+            subject=data["email_subject"],
+            body=data["email_body"],
+        )
 
     @staticmethod
     def validate_user_password(password):
@@ -129,15 +103,11 @@ class Utils:
     @staticmethod
     def authenticate_user(token: str):
         try:
-            dt = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            exp = int("{}".format(dt['exp']))
-            if time.time() < exp:
-                email = jwt.decode(token, settings.SECRET_KEY,
-                                   algorithms=["HS256"])["username"]
-                user = User.objects.get(email=email)
-                return {"status": True, "message": "authenticated", "user": user}
-            else:
-                return {"status": False, "message": "token expired", "user": User()}
+            dt = decode_token(token)
+            user = User.objects.get(email=dt["username"])
+            return {"status": True, "message": "authenticated", "user": user}
+        except jwt.ExpiredSignatureError:
+            return {"status": False, "message": "token expired", "user": User()}
         except Exception as e:
             return {"status": False, "message": e, "user": User()}
 
@@ -169,9 +139,8 @@ class Utils:
     @staticmethod
     def refresh_token(refresh:str) -> dict:
         try:
-            payload = jwt.decode(
-                refresh, settings.SECRET_KEY, algorithms=["HS256"])
-            user = User.objects.get(id=payload["user_id"])
+            payload = decode_token(refresh)
+            user = get_cached_user(payload["user_id"])
             token = RefreshToken.for_user(user)
             return {
                 'access': str(token.access_token)
@@ -185,9 +154,8 @@ class Utils:
     @staticmethod
     def get_token_user(token:str) -> dict:
         try:
-            payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=["HS256"])
-            user = User.objects.get(id=payload["user_id"])
+            payload = decode_token(token)
+            user = get_cached_user(payload["user_id"])
             return {
                 'user': user
             }